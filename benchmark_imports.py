@@ -0,0 +1,80 @@
+"""
+导入耗时基准
+用 python -X importtime 在全新的解释器中测量各子系统模块的导入耗时，并检查没有加载不该加载的重量级依赖
+（例如只导入 douban_analysis 时不应该加载 matplotlib/pandas/requests），防止启动变慢的回归
+
+用法：python benchmark_imports.py [--repeat 3] [--scale 1.0]
+超出预算或加载了禁止的依赖时以退出码 1 结束，可以放在定时任务/CI 里作为检查
+"""
+
+import argparse  # 命令行参数
+import os  # 项目目录
+import subprocess  # 在全新的解释器中导入
+import sys  # 当前解释器路径
+
+ROOT = os.path.dirname(os.path.abspath(__file__))  # 项目根目录
+
+# 模块: (导入耗时预算（毫秒）, 导入后不允许出现的顶层模块)
+TARGETS = {
+    'douban_config': (50, ['pandas', 'numpy', 'matplotlib', 'wordcloud', 'requests', 'bs4', 'lxml']),
+    'douban_analysis': (50, ['pandas', 'numpy', 'matplotlib', 'wordcloud', 'requests', 'bs4', 'lxml']),
+    'douban_spider': (800, ['pandas', 'matplotlib', 'wordcloud']),
+    'douban_processing': (1500, ['matplotlib', 'wordcloud', 'requests', 'bs4', 'lxml']),
+    'douban_storage': (1500, ['matplotlib', 'wordcloud', 'requests', 'bs4', 'lxml']),
+    'douban_report': (1500, ['matplotlib', 'wordcloud', 'requests', 'bs4', 'lxml']),
+    'douban_visualization': (3000, ['requests', 'bs4', 'lxml']),
+}
+
+
+def measure(module):
+    """
+    在新的解释器中导入一次模块
+    返回：(累计导入耗时（毫秒）, 加载过的全部顶层模块名集合)
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+
+    total_ms, loaded = None, set()
+    for line in result.stderr.splitlines():
+        # 格式：import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue  # 表头
+        loaded.add(name.split('.')[0])
+        if name == module:
+            total_ms = int(cumulative) / 1000
+    return total_ms, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='子系统导入耗时基准')
+    parser.add_argument('--repeat', type=int, default=3, help='每个模块测量次数，取最小值')
+    parser.add_argument('--scale', type=float, default=1.0, help='预算倍数（较慢的机器可以调大）')
+    args = parser.parse_args()
+
+    print(f"{'模块':<22}{'耗时(ms)':>10}{'预算(ms)':>10}  结果")
+    failed = False
+    for module, (budget_ms, forbidden) in TARGETS.items():
+        runs = [measure(module) for _ in range(args.repeat)]
+        total_ms = min(ms for ms, _ in runs)
+        loaded = runs[0][1]
+        problems = []
+        if total_ms > budget_ms * args.scale:
+            problems.append('超出预算')
+        heavy = sorted(set(forbidden) & loaded)
+        if heavy:
+            problems.append(f"加载了 {', '.join(heavy)}")
+        failed |= bool(problems)
+        status = '❌ ' + '；'.join(problems) if problems else '✓'
+        print(f"{module:<22}{total_ms:>10.1f}{budget_ms * args.scale:>10.0f}  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,14 @@
 # check_scores.py - 验证前10部电影的原始评分
-import requests
 from bs4 import BeautifulSoup
 import re
+from douban_net import get_session, get_scheduler, get_cache, get_breaker, fetch_text, RetryPolicy
 
 headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
 url = 'https://movie.douban.com/top250?start=0&filter='
-response = requests.get(url, headers=headers)
-soup = BeautifulSoup(response.text, 'html.parser')
+# 与爬虫、test.py 共用同一个按主机的令牌桶（请求前等待、收到响应后反馈状态码）和响应缓存
+html = fetch_text(get_session().get, url, headers=headers, timeout=15,
+                  cache=get_cache(), scheduler=get_scheduler(), retry=RetryPolicy(), breaker=get_breaker())
+soup = BeautifulSoup(html, 'html.parser')
 
 items = soup.find_all('div', class_='item')[:10]  # 只看前10个
 
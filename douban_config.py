@@ -0,0 +1,64 @@
+"""
+豆瓣电影Top250数据分析系统 - 配置
+所有子系统共享的配置参数（不导入任何第三方库，可以被任何入口快速加载）
+"""
+
+
+class Config:
+    """项目配置类，存储所有配置参数"""
+    BASE_URL = 'https://movie.douban.com/top250'  # 豆瓣电影Top250基础URL
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',  # 模拟浏览器请求
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'zh-CN,zh;q=0.9',  # 接受中文语言
+    }
+    DB_NAME = 'douban_movies.db'  # SQLite数据库文件名
+    DB_BATCH_SIZE = 500  # 批量写库时每次 executemany 的行数
+    DB_PRAGMAS = {  # SQLite 性能配置，连接时依次执行
+        'journal_mode': 'WAL',  # 预写日志：爬虫写库的同时，分析/仪表板可以并发读取
+        'synchronous': 'NORMAL',  # WAL模式下足够安全，提交时不再每次fsync
+        'mmap_size': 256 * 1024 * 1024,  # 内存映射读取（256MB）
+        'cache_size': -64000,  # 页缓存大小，负数单位为KB（约64MB）
+        'temp_store': 'MEMORY',  # 临时表和排序放在内存中
+        'busy_timeout': 5000,  # 遇到锁时最多等待5秒，而不是立即报错
+    }
+    RATE_LIMIT = 0.5  # 每个主机每秒允许的请求数（平均2秒一个请求），防止被封IP
+    RATE_BURST = 3  # 允许的突发请求数（令牌桶容量）
+    MAX_PAGES = 2  # 测试用2页，完整爬取改为10（每页25部电影，10页=250部）
+    PARSER_BACKEND = 'bs4'  # 列表页解析后端：'bs4'（BeautifulSoup）或 'lxml'（预编译XPath，单次遍历，更快）
+    RESTRICTED_PARSE = True  # bs4后端只构建 div.item / 剧情简介 子树，节省内存和解析时间
+    PIPELINE_CRAWL = False  # 流水线模式：抓取线程与解析进程池分离（优先于 ASYNC_CRAWL）
+    PIPELINE_WORKERS = None  # 解析进程数，None 表示使用全部CPU核心
+    PIPELINE_QUEUE_SIZE = 8  # 抓取→解析之间的队列容量（页），队列满时抓取线程等待
+    ASYNC_CRAWL = False  # 是否使用异步并发爬取模式
+    CONCURRENCY = 4  # 异步模式下同时进行的最大请求数
+    POOL_SIZE = 8  # 每个主机保持的长连接数（应不小于 CONCURRENCY）
+    HTTP2 = False  # 安装了 httpx[http2] 时使用 HTTP/2
+    FETCH_DETAILS = False  # 异步模式下是否同时抓取详情页
+    DETAIL_CRAWL = False  # 运行全部阶段时是否包含 details 阶段（并发抓取所有详情页，结构化字段写入 movie_details 表）
+    MAX_RETRIES = 3  # 单个请求失败后的最多重试次数（指数退避+随机抖动）
+    RETRY_BASE_DELAY = 1.0  # 重试退避的基础等待时间（秒）
+    RETRY_MAX_DELAY = 30.0  # 单次重试等待时间上限（秒）
+    BREAKER_THRESHOLD = 5  # 同一主机连续失败多少次后熔断
+    BREAKER_RESET = 60  # 熔断持续时间（秒）
+    CACHE_ENABLED = True  # 是否启用磁盘响应缓存
+    CACHE_DIR = '.http_cache'  # 缓存目录（与 test.py 共享）
+    CACHE_TTL = 24 * 3600  # 缓存有效期（秒），过期后向服务器做条件请求重新验证
+    CACHE_MAX_MB = 200  # 缓存总大小上限（MB），超出后淘汰最久未访问的页面
+    CACHE_OFFLINE = False  # 离线模式：只从缓存读取页面，不访问网络（开发调试解析器时使用）
+    INCREMENTAL = False  # 增量模式：只对新增/变化的电影抓取详情页并写库，不再整表重建
+    INCREMENTAL_KEY = 'url'  # 增量比对使用的键（'url' 或 'rank'）
+    INCREMENTAL_FIELDS = ['rank', 'title', 'rating', 'votes', 'director', 'year',
+                          'country', 'tags', 'quote', 'image_url']  # 参与比对的列表页字段
+    VOTES_TOLERANCE = 0.01  # 评价人数相对变化小于1%时视为未变化（评价人数每天都会小幅增长）
+    SQL_ANALYTICS = True  # 报告的聚合统计在SQLite中计算（GROUP BY/窗口函数），失败时回退到pandas
+    PARQUET_EXPORT = False  # 每次爬取后同时写入列式 Parquet 数据集（需要安装 pyarrow）
+    PARQUET_DIR = 'movies_dataset'  # Parquet 数据集根目录，按 crawl_id=N/ 分区
+    PARALLEL_CHARTS = True  # 各图表在进程池中并行渲染（单核机器上自动改为顺序渲染）
+    CHART_WORKERS = None  # 渲染进程数，None 表示 min(图表数, CPU核心数)
+    WORDCLOUD_FONT = None  # 词云使用的中文字体文件路径，None 表示自动查找（常见路径 + fontconfig）
+    WORDCLOUD_LAYOUTS = 'wordcloud_layouts.json'  # 词云布局缓存文件（并行渲染的各进程共享，图片样式变了也不必重新布局）
+    CHART_CACHE = True  # 图表输入数据和样式没变、图片仍在时跳过渲染
+    CHART_MANIFEST = 'chart_manifest.json'  # 记录每张图片指纹的清单文件
+    CHECKPOINT_DIR = '.checkpoints'  # 各阶段输出的检查点目录（命令行分阶段运行和 --resume 使用）
+    CRAWL_TTL_HOURS = 24  # --resume 时爬取检查点的有效期（小时），过期后重新爬取；None 表示一直有效
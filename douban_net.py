@@ -0,0 +1,602 @@
+"""
+豆瓣爬虫公共网络层
+供 douban_spider.py 和 test.py 等所有抓取脚本共享
+"""
+
+import asyncio  # 异步等待
+import hashlib  # 计算缓存键
+import json  # 缓存元数据
+import os  # 缓存文件读写
+import random  # 重试抖动
+import threading  # 线程锁，保证令牌桶在多线程/协程下安全
+import time  # 时间相关功能
+from email.utils import parsedate_to_datetime  # 解析 Retry-After 中的HTTP日期
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode  # 解析URL，按主机区分限速、规范化缓存键
+
+import requests  # HTTP客户端
+from requests.adapters import HTTPAdapter  # 连接池配置
+from urllib3.util.request import ACCEPT_ENCODING  # urllib3 能解码的压缩格式（安装 brotli 后包含 br）
+
+try:
+    import httpx  # 可选依赖：安装 httpx[http2] 后可以使用 HTTP/2
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
+# ========== 默认参数 ==========
+DEFAULT_RATE = 0.5  # 每个主机每秒补充的令牌数（即平均每2秒一个请求）
+DEFAULT_BURST = 3  # 令牌桶容量，允许的突发请求数
+MIN_RATE = 0.05  # 自适应退避时速率的下限（每20秒一个请求）
+BACKOFF_STATUS = (403, 429)  # 触发退避的状态码（被拒绝/请求过多）
+DEFAULT_CACHE_DIR = '.http_cache'  # 响应缓存目录
+DEFAULT_CACHE_TTL = 24 * 3600  # 缓存有效期（秒），过期后用 ETag/Last-Modified 重新验证
+DEFAULT_CACHE_MAX_BYTES = 200 * 1024 * 1024  # 缓存总大小上限，超出后按最近最少使用淘汰
+CACHE_EVICT_RATIO = 0.9  # 淘汰到上限的90%为止，留出余量，避免缓存满后每次写入都扫描目录
+DEFAULT_MAX_RETRIES = 3  # 单个请求最多重试次数
+DEFAULT_RETRY_BASE_DELAY = 1.0  # 指数退避的基础等待时间（秒）
+DEFAULT_RETRY_MAX_DELAY = 30.0  # 单次重试等待时间上限（秒）
+RETRY_STATUS = (429, 500, 502, 503, 504)  # 可重试的状态码（限流和服务端临时错误）
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')  # 只有幂等请求才自动重试
+DEFAULT_BREAKER_THRESHOLD = 5  # 连续失败多少次后熔断
+DEFAULT_BREAKER_RESET = 60  # 熔断持续时间（秒），之后放行试探请求
+BREAKER_STATUS = (403, 429)  # 计入熔断的4xx状态码（被拒绝/限流）；5xx 和网络错误总是计入
+DEFAULT_POOL_SIZE = 8  # 每个主机保持的最大连接数
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+}
+# ==============================
+
+
+# ==================== 传输模块 ====================
+class _Http2Response:
+    """把 httpx 响应包装成 fetch_text 需要的 requests 风格接口"""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.encoding = None
+
+    @property
+    def text(self):
+        return self._response.content.decode(self.encoding or self._response.encoding or 'utf-8', errors='replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code} Error for url: {self._response.url}',
+                                                response=self)
+
+
+class _Http2Session:
+    """基于 httpx 的 HTTP/2 会话，get() 的参数、返回值和异常类型与 requests.Session 保持一致"""
+
+    def __init__(self, pool_size, headers):
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.client = httpx.Client(http2=True, limits=limits, headers=headers, follow_redirects=True)
+        self.headers = self.client.headers
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        try:
+            return _Http2Response(self.client.get(url, params=params, headers=headers, timeout=timeout))
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e))
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+
+    def close(self):
+        self.client.close()
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE, headers=None, http2=False):
+    """
+    创建共享传输会话
+    - 连接池：每个主机最多保持 pool_size 个长连接，所有请求复用，避免重复 TCP+TLS 握手
+    - 压缩：声明 urllib3 能解码的全部格式（gzip/deflate，安装 brotli 后还有 br）
+    - HTTP/2：http2=True 且安装了 httpx[http2] 时使用，否则退回 requests（HTTP/1.1 keep-alive）
+    参数：pool_size 连接池大小；headers 额外请求头
+    返回：具有 get(url, params=, headers=, timeout=) 方法的会话对象
+    """
+    session_headers = dict(DEFAULT_HEADERS)
+    session_headers.update(headers or {})
+    session_headers['Accept-Encoding'] = ACCEPT_ENCODING
+    session_headers['Connection'] = 'keep-alive'
+    if http2:
+        if httpx is not None:
+            return _Http2Session(pool_size, session_headers)
+        print("  ⚠️  未安装 httpx[http2]，使用 HTTP/1.1 连接池")
+
+    session = requests.Session()
+    session.headers.update(session_headers)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_shared_session = None
+
+
+def get_session():
+    """返回进程内共享的传输会话（供没有自己会话的脚本使用）"""
+    global _shared_session
+    if _shared_session is None:
+        _shared_session = create_session()
+    return _shared_session
+
+
+def benchmark_connection_reuse(url, rounds=5, headers=None):
+    """
+    测量连接复用的收益：同一URL分别用共享会话和“每次新建连接”各请求 rounds 次
+    返回：{'reuse': 平均耗时, 'new_connection': 平均耗时, 'saving': 每次请求节省的秒数}
+    """
+    def timed(get):
+        start = time.perf_counter()
+        get(url, headers=headers, timeout=15).raise_for_status()
+        return time.perf_counter() - start
+
+    session = create_session(headers=headers)
+    timed(session.get)  # 预热：建立连接
+    reuse = sum(timed(session.get) for _ in range(rounds)) / rounds
+    fresh = []
+    for _ in range(rounds):
+        one_off = create_session(headers=headers)
+        fresh.append(timed(one_off.get))
+        one_off.close()
+    new_connection = sum(fresh) / rounds
+    session.close()
+    print(f"⏱️  连接复用: {reuse * 1000:.0f} ms/次，每次新建连接: {new_connection * 1000:.0f} ms/次，"
+          f"节省 {(new_connection - reuse) * 1000:.0f} ms/次")
+    return {'reuse': reuse, 'new_connection': new_connection, 'saving': new_connection - reuse}
+# =================================================
+
+
+# ==================== 限速调度模块 ====================
+class TokenBucket:
+    """单个主机的令牌桶：按 rate 匀速补充令牌，最多积累 burst 个，允许短时突发"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.base_rate = rate  # 配置的目标速率
+        self.rate = rate  # 当前速率（退避时会降低，成功后逐步恢复）
+        self.capacity = burst
+        self.tokens = float(burst)  # 初始时桶是满的
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # 退避冷却截止时间
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        预定一个令牌
+        返回：需要等待的秒数（0表示可以立即发出请求）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1  # 允许透支，透支部分就是需要排队等待的时间
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def backoff(self):
+        """被服务器拒绝时：速率减半并冷却一个新的请求间隔"""
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)  # 清空积累的突发额度
+            self.blocked_until = time.monotonic() + 1 / self.rate
+
+    def recover(self):
+        """请求成功时：速率按目标速率的10%逐步恢复"""
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+
+class PoliteScheduler:
+    """
+    礼貌调度器：为每个主机维护一个令牌桶
+    发请求前调用 wait()/wait_async()，收到响应后调用 feedback() 反馈状态码
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # 主机名 -> TokenBucket
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        """获取URL所属主机的令牌桶（不存在时创建）"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def wait(self, url):
+        """同步等待，直到可以向该主机发出请求"""
+        delay = self.bucket(url).reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url):
+        """异步等待，不阻塞事件循环"""
+        delay = self.bucket(url).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def feedback(self, url, status_code):
+        """根据响应状态码调整速率：403/429 退避，2xx/3xx 逐步恢复"""
+        if status_code in BACKOFF_STATUS:
+            self.bucket(url).backoff()
+            print(f"  ⚠️  {urlsplit(url).netloc} 返回 {status_code}，降低请求速率")
+        elif status_code < 400:
+            self.bucket(url).recover()
+
+
+_shared_scheduler = None
+
+
+def get_scheduler(rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+    """
+    返回进程内共享的调度器，所有抓取脚本（爬虫类、test.py）对同一主机共用一个令牌桶
+    参数：rate/burst 只在第一次创建时生效，之后的调用返回同一个调度器
+    """
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        _shared_scheduler = PoliteScheduler(rate, burst)
+    return _shared_scheduler
+# =================================================
+
+
+# ==================== 响应缓存模块 ====================
+class CacheMiss(Exception):
+    """离线模式下缓存中没有对应页面"""
+
+
+def canonical_url(url, params=None):
+    """把URL自带的查询参数和params合并并排序，保证 ?start=0&filter= 与 params={'start': 0} 命中同一条缓存"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query += [(k, '' if v is None else str(v)) for k, v in (params or {}).items()]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ''))
+
+
+class ResponseCache:
+    """
+    磁盘响应缓存
+    每条记录按规范化URL的sha256命名，正文存 <key>.html，元数据存 <key>.json；
+    文件修改时间记录最近访问时间，用于按容量做LRU淘汰
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_CACHE_TTL,
+                 max_bytes=DEFAULT_CACHE_MAX_BYTES, offline=False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline  # 离线模式：只读缓存、忽略有效期，不访问网络
+        self._total = None  # 缓存总字节数，第一次写入时扫描一次目录，之后在内存中增减
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(url, params=None):
+        """计算缓存键"""
+        return hashlib.sha256(canonical_url(url, params).encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.html', base + '.json'
+
+    def get(self, url, params=None):
+        """
+        读取缓存记录（不论是否过期）
+        返回：包含 body/etag/last_modified/stored_at 的字典，或None
+        """
+        body_path, meta_path = self._paths(self.key(url, params))
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(body_path, encoding='utf-8') as f:
+                entry['body'] = f.read()
+            os.utime(body_path)  # 更新访问时间，供LRU使用
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        """缓存记录是否还在有效期内（离线模式下忽略有效期）"""
+        return entry is not None and (self.offline or time.time() - entry['stored_at'] < self.ttl)
+
+    def get_fresh(self, url, params=None):
+        """返回未过期的缓存正文（离线模式下忽略有效期），否则返回None"""
+        entry = self.get(url, params)
+        return entry['body'] if self.is_fresh(entry) else None
+
+    @staticmethod
+    def validators(entry):
+        """根据缓存记录生成条件请求头"""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    @staticmethod
+    def _entry_size(*paths):
+        """一条记录占用的字节数（文件不存在时按0计）"""
+        size = 0
+        for path in paths:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def put(self, url, params, body, headers=None):
+        """
+        写入缓存（先写临时文件再替换，避免并发读到半个文件）
+        总大小在内存中累计，只有超过上限时才扫描目录做淘汰
+        """
+        headers = headers or {}
+        key = self.key(url, params)
+        body_path, meta_path = self._paths(key)
+        meta = {
+            'url': canonical_url(url, params),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'stored_at': time.time(),
+        }
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan()[1]
+            old_size = self._entry_size(body_path, meta_path)
+            for path, content in ((body_path, body), (meta_path, json.dumps(meta, ensure_ascii=False))):
+                tmp_path = f'{path}.{threading.get_ident()}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            self._total += self._entry_size(body_path, meta_path) - old_size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def refresh(self, url, params=None, headers=None, entry=None):
+        """
+        服务器返回304时，只更新存储时间（以及新的校验值）
+        参数：entry 调用方已经读取的缓存记录（不传时重新读取）
+        """
+        entry = entry or self.get(url, params)
+        if entry:
+            self.put(url, params, entry['body'], {
+                'ETag': (headers or {}).get('ETag') or entry.get('etag'),
+                'Last-Modified': (headers or {}).get('Last-Modified') or entry.get('last_modified'),
+            })
+
+    def _scan(self):
+        """
+        扫描缓存目录
+        返回：([(最近访问时间, 字节数, 正文路径, 元数据路径)], 总字节数)
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.html'):
+                continue
+            body_path = os.path.join(self.cache_dir, name)
+            meta_path = body_path[:-len('.html')] + '.json'
+            try:
+                size = os.path.getsize(body_path) + os.path.getsize(meta_path)
+                entries.append((os.path.getmtime(body_path), size, body_path, meta_path))
+            except OSError:
+                continue
+            total += size
+        return entries, total
+
+    def _evict(self):
+        """
+        总大小超过上限时，删除最久未访问的记录，直到低于上限的 CACHE_EVICT_RATIO
+        重新扫描目录得到准确的总大小（其他进程也可能写入同一个缓存目录）
+        """
+        entries, total = self._scan()
+        if total <= self.max_bytes:
+            self._total = total
+            return
+        for _, size, body_path, meta_path in sorted(entries):
+            if total <= self.max_bytes * CACHE_EVICT_RATIO:
+                break
+            for path in (body_path, meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+        self._total = total
+
+
+_shared_cache = None
+
+
+def get_cache():
+    """返回进程内共享的响应缓存"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResponseCache()
+    return _shared_cache
+# =================================================
+
+
+# ==================== 重试与熔断模块 ====================
+class CircuitOpenError(Exception):
+    """目标主机的熔断器处于打开状态，请求被直接拒绝"""
+
+
+def parse_retry_after(value):
+    """解析 Retry-After 响应头（秒数或HTTP日期），返回需要等待的秒数，无法解析时返回None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    重试策略：指数退避 + 全抖动（在 [0, base*2^n] 之间随机），
+    只对幂等请求（GET/HEAD）、网络错误和可重试状态码进行重试，并遵守 Retry-After
+    """
+
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES, base_delay=DEFAULT_RETRY_BASE_DELAY,
+                 max_delay=DEFAULT_RETRY_MAX_DELAY, retry_status=RETRY_STATUS):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_status = retry_status
+
+    def is_retryable(self, error, method='GET'):
+        """判断一次失败是否值得重试"""
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return False
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        response = getattr(error, 'response', None)
+        return response is not None and response.status_code in self.retry_status
+
+    def delay(self, attempt, retry_after=None):
+        """第 attempt 次重试前的等待时间（attempt 从0开始）"""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            return max(backoff, min(retry_after, self.max_delay))  # 服务器要求的等待时间优先
+        return backoff
+
+
+class CircuitBreaker:
+    """
+    按主机的熔断器：连续失败达到阈值后打开，在冷却期内直接拒绝请求；
+    冷却结束后恢复放行（半开），成功一次即关闭，再失败则立即重新打开
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_BREAKER_THRESHOLD, reset_timeout=DEFAULT_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = {}  # 主机名 -> 连续失败次数
+        self._opened_at = {}  # 主机名 -> 打开时间
+        self._lock = threading.Lock()
+
+    def remaining(self, url):
+        """熔断器还需要多少秒才能放行（0表示可以请求）"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return 0.0
+            return max(0.0, opened_at + self.reset_timeout - time.monotonic())
+
+    @staticmethod
+    def is_failure(error):
+        """
+        一次失败是否说明主机本身有问题：网络错误、5xx、403/429 计入；
+        404 等其他4xx只是这个URL无效，不应让整个主机熔断
+        """
+        response = getattr(error, 'response', None)
+        if response is None:
+            return True
+        return response.status_code >= 500 or response.status_code in BREAKER_STATUS
+
+    def allow(self, url):
+        """是否允许向该主机发出请求"""
+        return self.remaining(url) == 0
+
+    def record_success(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            self._failures[host] = 0
+            self._opened_at.pop(host, None)
+
+    def record_failure(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self._failures[host] >= self.failure_threshold:
+                if host not in self._opened_at:
+                    print(f"  ⛔ {host} 连续失败 {self._failures[host]} 次，熔断 {self.reset_timeout} 秒")
+                self._opened_at[host] = time.monotonic()
+
+
+_shared_breaker = None
+
+
+def get_breaker():
+    """返回进程内共享的熔断器"""
+    global _shared_breaker
+    if _shared_breaker is None:
+        _shared_breaker = CircuitBreaker()
+    return _shared_breaker
+# =================================================
+
+
+# ==================== 请求入口 ====================
+def _fetch_once(get, url, params, headers, timeout, cache, entry, scheduler, wait):
+    """
+    发送一次请求（缓存、条件请求、限速反馈），失败时抛出异常
+    参数：entry fetch_text 已经读取的过期缓存记录（没有时为None），用于条件请求头和304
+    """
+    request_headers = dict(headers or {})
+    request_headers.update(ResponseCache.validators(entry))  # 过期记录带上条件请求头
+
+    if scheduler is not None and wait:
+        scheduler.wait(url)
+    response = get(url, params=params, headers=request_headers, timeout=timeout)
+    if scheduler is not None:
+        scheduler.feedback(url, response.status_code)
+
+    if response.status_code == 304 and entry:
+        cache.refresh(url, params, response.headers, entry)  # 内容未变，沿用缓存
+        return entry['body']
+    response.raise_for_status()
+    response.encoding = 'utf-8'
+    if cache is not None:
+        cache.put(url, params, response.text, response.headers)
+    return response.text
+
+
+def fetch_text(get, url, params=None, headers=None, timeout=15, cache=None, scheduler=None, wait=True,
+               retry=None, breaker=None):
+    """
+    带缓存、限速、重试和熔断的GET请求
+    参数：get 实际发请求的函数（requests.get 或 session.get）；
+         wait=False 表示调用方已经等待过第一次请求的令牌（异步模式）；
+         retry 重试策略（None 表示不重试）；breaker 熔断器（None 表示不熔断）
+    返回：页面文本；最终失败时抛出异常
+    """
+    entry = None
+    if cache is not None:
+        entry = cache.get(url, params)  # 只读取一次，过期时交给 _fetch_once 做条件请求
+        if cache.is_fresh(entry):
+            return entry['body']  # 缓存命中且未过期，不访问网络
+        if cache.offline:
+            raise CacheMiss(f'离线模式下缓存未命中: {canonical_url(url, params)}')
+
+    attempt = 0
+    while True:
+        if breaker is not None and not breaker.allow(url):
+            raise CircuitOpenError(f'{urlsplit(url).netloc} 已熔断，{breaker.remaining(url):.0f} 秒后重试')
+        try:
+            text = _fetch_once(get, url, params, headers, timeout, cache, entry, scheduler, wait or attempt > 0)
+        except requests.exceptions.RequestException as e:
+            if breaker is not None and breaker.is_failure(e):
+                breaker.record_failure(url)
+            if retry is None or attempt >= retry.max_retries or not retry.is_retryable(e):
+                raise
+            response = getattr(e, 'response', None)
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+            delay = retry.delay(attempt, retry_after)
+            attempt += 1
+            print(f"  🔁 请求失败（{e}），{delay:.1f} 秒后第 {attempt} 次重试: {url}")
+            time.sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success(url)
+        return text
+# =================================================
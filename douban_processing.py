@@ -0,0 +1,411 @@
+"""
+豆瓣电影Top250数据分析系统 - 数据处理子系统
+数据清洗流水线、紧凑列类型、向量化标签统计、流式统计
+"""
+
+import pandas as pd  # 数据处理库，用于数据清洗和分析
+import numpy as np  # 科学计算库
+from collections import Counter  # 计数统计
+import time  # 清洗步骤计时
+import weakref  # 按DataFrame对象缓存标签统计结果
+
+# ==================== 数据处理模块 ====================
+class DataProcessor:
+    """数据清洗和预处理类"""
+
+    # 评分分类的区间和标签
+    RATING_BINS = [0, 7.0, 8.0, 8.5, 9.0, 10]
+    RATING_LABELS = ['一般(<7)', '良好(7-8)', '优秀(8-8.5)', '经典(8.5-9)', '神作(>9)']
+
+    # 紧凑的列类型：重复较多的字符串用分类类型，数值列降到够用的位宽
+    CATEGORY_COLUMNS = ['director', 'country', 'tags']
+    INT_COLUMNS = {'rank': 'int16', 'year': 'int16', 'votes': 'int32'}  # 有缺失值时退为 float32
+    FLOAT_COLUMNS = {'rating': 'float32'}
+    TIME_FORMAT = '%Y-%m-%d %H:%M:%S'  # crawl_time 的文本格式（写库时还原成这个格式）
+
+    # 必需的列及其缺失时的默认值
+    REQUIRED_DEFAULTS = {'director': '未知导演', 'country': '未知国家/地区', 'quote': '', 'tags': '',
+                         'rating': 0.0, 'votes': 0}
+    FILL_VALUES = {'director': '未知导演', 'country': '未知国家/地区', 'quote': '', 'tags': ''}  # 缺失值填充
+    DUPLICATE_KEYS = ['title', 'rating', 'director']  # 判断重复记录的列
+
+    @staticmethod
+    def clean_data(movies_df, track_memory=True):
+        """
+        数据清洗（安全版）
+        按 CleaningPipeline 的步骤就地清洗，并输出每一步的耗时和内存变化
+        参数：包含原始电影数据的DataFrame；track_memory 是否统计内存（deep统计本身有开销，不计入步骤耗时）
+        返回：清洗后的DataFrame
+        """
+        print("🧹 正在进行数据清洗...")
+        memory_before = movies_df.memory_usage(deep=True) if track_memory else None
+
+        pipeline = CleaningPipeline(track_memory=track_memory)
+        movies_df = pipeline.run(movies_df)
+
+        print(f"  ✓ 数据清洗完成，移除 {pipeline.context['removed']} 条重复记录")
+        print(f"  ✓ 最终数据形状: {movies_df.shape[0]} 行 × {movies_df.shape[1]} 列")
+        pipeline.print_report()
+        if track_memory:
+            report = DataProcessor.memory_report(memory_before, movies_df.memory_usage(deep=True))
+            before, after = report.loc['总计', 'before_kb'], report.loc['总计', 'after_kb']
+            print(f"  ✓ 内存占用: {before:.1f} KB → {after:.1f} KB（减少 {(1 - after / before) * 100 if before else 0:.0f}%）")
+        return movies_df
+
+    @staticmethod
+    def clean_data_chunked(chunks, votes_max=None, track_memory=False):
+        """
+        分块清洗：逐块清洗并产出，内存中只保留当前块，以及已见记录键的64位哈希（跨块去重用，
+        每个不同的 标题+评分+导演 占8字节，即内存随不同记录数而不是总行数增长，结束时打印其大小）
+        各块的值与整体 clean_data 的结果相同；分类列的类别按各块内首次出现的顺序，块与块之间不统一
+        参数：chunks 可迭代的DataFrame块（如 pd.read_sql_query(..., chunksize=N)）；
+              votes_max 全体数据的最大评价人数，用于计算热度；不传时热度留空，
+              交给 DatabaseManager.save_movies_stream 写完后在SQL中统一计算
+        """
+        print("🧹 正在分块清洗数据...")
+        pipeline = CleaningPipeline(track_memory=track_memory)
+        yield from pipeline.run_chunked(chunks, votes_max)
+        seen = pipeline.context['seen']
+        print(f"  ✓ 分块清洗完成，移除 {pipeline.context['removed']} 条重复记录"
+              f"（去重哈希 {len(seen)} 条，占用 {seen.nbytes / 1024:.1f} KB）")
+        pipeline.print_report()
+
+    @staticmethod
+    def clean_steps():
+        """默认的清洗步骤，(名称, 函数) 列表；函数签名为 step(movies_df, context) -> movies_df"""
+        return [
+            ('补全必需列', DataProcessor._ensure_columns),
+            ('去除重复', DataProcessor._drop_duplicates),
+            ('填充缺失值+紧凑类型', DataProcessor._fill_and_compact),
+            ('衍生特征', DataProcessor._derive_features),
+        ]
+
+    @staticmethod
+    def _ensure_columns(movies_df, context):
+        """1. 确保DataFrame包含所有必需的列"""
+        warned = context.setdefault('warned', set())
+        for col, default in DataProcessor.REQUIRED_DEFAULTS.items():
+            if col not in movies_df.columns:
+                if col not in warned:
+                    print(f"  ⚠️  警告：列 '{col}' 不存在，将创建并填充默认值")
+                    warned.add(col)
+                movies_df[col] = default
+        return movies_df
+
+    @staticmethod
+    def _drop_duplicates(movies_df, context):
+        """2. 移除完全重复的数据行；分块模式下还要去掉之前的块中出现过的记录"""
+        initial_count = len(movies_df)
+        movies_df.drop_duplicates(subset=DataProcessor.DUPLICATE_KEYS, keep='first', inplace=True)
+        seen = context.get('seen')
+        if seen is not None:
+            # seen 是已排序的 uint64 数组：每个已见记录键只占8字节（Python集合中的整数约占60字节）
+            keys = movies_df[DataProcessor.DUPLICATE_KEYS].astype(object)
+            hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+            positions = np.searchsorted(seen, hashes)
+            found = positions < len(seen)
+            found[found] = seen[positions[found]] == hashes[found]
+            is_new = ~found
+            # 两段有序数据拼接后用 stable（归并）排序，代价接近线性
+            context['seen'] = np.sort(np.concatenate([seen, hashes[is_new]]), kind='stable')
+            if not is_new.all():
+                if movies_df.index.is_unique:
+                    movies_df.drop(index=movies_df.index[~is_new], inplace=True)
+                else:
+                    movies_df = movies_df[is_new].copy()
+        context['removed'] += initial_count - len(movies_df)
+        return movies_df
+
+    @staticmethod
+    def _fill_and_compact(movies_df, context):
+        """3. 处理缺失值并转换为紧凑类型（两步合并：分类列先编码再在编码上填充，不复制字符串数组）"""
+        return DataProcessor.apply_schema(movies_df, fill_values=DataProcessor.FILL_VALUES)
+
+    @staticmethod
+    def _derive_features(movies_df, context):
+        """4. 创建衍生特征：评分分类、评价热度"""
+        # 评分分类
+        movies_df['rating_category'] = pd.cut(
+            movies_df['rating'],
+            bins=DataProcessor.RATING_BINS,
+            labels=DataProcessor.RATING_LABELS
+        )
+
+        # 计算评价热度（归一化到0-100）；分块模式下用全体数据的最大值，没有时留空
+        votes_max = context['votes_max'] if 'votes_max' in context else movies_df['votes'].max()
+        if votes_max is None:
+            movies_df['popularity'] = np.nan
+        elif votes_max > 0:
+            movies_df['popularity'] = (movies_df['votes'] / votes_max * 100).round(2)
+        else:
+            movies_df['popularity'] = 0.0
+        return movies_df
+
+    @staticmethod
+    def apply_schema(movies_df, fill_values=None):
+        """
+        就地把列转换为紧凑类型：分类字符串、int16/int32 整数、float32 评分、datetime64 爬取时间
+        分类的类别按首次出现的顺序排列，value_counts 遇到并列时与原来的字符串列顺序一致
+        参数：fill_values 同时填充缺失值的 {列名: 默认值}
+        """
+        fill_values = fill_values or {}
+        for col in DataProcessor.CATEGORY_COLUMNS:
+            if col not in movies_df.columns:
+                continue
+            values = movies_df[col]
+            default = fill_values.get(col)
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                categories = values.array
+            else:
+                uniques = values.unique()
+                if default is not None:
+                    # 类别只有几百个：在类别上填充再去重，默认值排在第一个缺失值的位置，
+                    # 与先 fillna 再建分类的顺序完全一致，而不必复制整列字符串
+                    uniques = pd.unique(pd.Series(uniques, dtype=object).fillna(default))
+                categories = pd.Categorical(values, categories=uniques[pd.notna(uniques)])
+            if default is not None and categories.isna().any():
+                if default not in categories.categories:
+                    categories = categories.add_categories([default])
+                categories = categories.fillna(default)
+            movies_df[col] = categories
+        for col, default in fill_values.items():
+            if col not in DataProcessor.CATEGORY_COLUMNS and col in movies_df.columns and movies_df[col].hasnans:
+                movies_df[col] = movies_df[col].fillna(default)
+        for col, dtype in DataProcessor.INT_COLUMNS.items():
+            if col in movies_df.columns and movies_df[col].dtype != dtype:
+                values = pd.to_numeric(movies_df[col], errors='coerce')
+                movies_df[col] = values.astype(dtype if values.notna().all() else 'float32')
+        for col, dtype in DataProcessor.FLOAT_COLUMNS.items():
+            if col in movies_df.columns and movies_df[col].dtype != dtype:
+                movies_df[col] = pd.to_numeric(movies_df[col], errors='coerce').astype(dtype)
+        if 'crawl_time' in movies_df.columns and not pd.api.types.is_datetime64_any_dtype(movies_df['crawl_time']):
+            movies_df['crawl_time'] = pd.to_datetime(movies_df['crawl_time'], format=DataProcessor.TIME_FORMAT,
+                                                     errors='coerce')
+        return movies_df
+
+    @staticmethod
+    def memory_report(before, after):
+        """
+        清洗前后的内存占用对比
+        参数：before/after 为 DataFrame.memory_usage(deep=True) 的结果
+        返回：按列对比的DataFrame（单位KB），最后一行为总计
+        """
+        report = pd.DataFrame({'before_kb': before, 'after_kb': after}).drop(index='Index', errors='ignore') / 1024
+        report.loc['总计'] = report.sum()
+        return report.round(1)
+
+    @staticmethod
+    def to_plain(movies_df, columns):
+        """
+        把紧凑类型还原为写库和比对使用的普通类型：
+        分类→字符串，float32→按最短十进制表示转成float64（避免 8.9 变成 8.899999618530273），datetime→文本
+        """
+        plain = {}
+        for col in columns:
+            values = movies_df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype(object)
+            elif pd.api.types.is_datetime64_any_dtype(values):
+                values = values.dt.strftime(DataProcessor.TIME_FORMAT)
+            elif values.dtype == np.float32:
+                values = values.astype(str).astype('float64')
+            plain[col] = values
+        return pd.DataFrame(plain, index=movies_df.index)
+
+    @staticmethod
+    def extract_tags_statistics(movies_df):
+        """
+        提取标签统计信息
+        参数：电影DataFrame
+        返回：标签统计DataFrame
+        """
+        return TagAnalytics.top(movies_df, 20)  # 取前20个最常见的标签
+
+
+class TagAnalytics:
+    """
+    向量化的标签统计：用 str.split().explode() 一次拆分全部标签，再用 value_counts 计数
+    结果按DataFrame对象缓存，清洗、写库、报告等多处调用时同一份数据只拆分一次
+    """
+
+    _cache = {}  # id(DataFrame) -> (弱引用, 版本标记, {结果名: 结果})
+
+    @staticmethod
+    def _version(movies_df):
+        """
+        O(1) 的版本标记：行数和标签列底层数组的身份（只使用公开接口）
+        普通 numpy 列每次取 .array 都会新建包装对象，改用 to_numpy() 的数据地址（不复制）；
+        分类、字符串等扩展数组的 .array 就是列本身，直接用它的 id
+        重新赋值标签列、增删行都会改变它；原地修改单元格（df.loc[i, 'tags'] = ...）不会，需要调用 invalidate
+        """
+        tags = movies_df['tags']
+        if isinstance(tags.dtype, np.dtype):
+            return len(movies_df), tags.to_numpy().__array_interface__['data'][0]
+        return len(movies_df), id(tags.array)
+
+    @classmethod
+    def invalidate(cls, movies_df=None):
+        """丢弃某个DataFrame（不传则为全部）的缓存结果"""
+        if movies_df is None:
+            cls._cache.clear()
+        else:
+            cls._cache.pop(id(movies_df), None)
+
+    @classmethod
+    def _cached(cls, movies_df, name, compute):
+        """取缓存结果；DataFrame 已被回收或版本标记变化时重新计算"""
+        key = id(movies_df)
+        fingerprint = cls._version(movies_df)
+        entry = cls._cache.get(key)
+        if entry is None or entry[0]() is not movies_df or entry[1] != fingerprint:
+            entry = (weakref.ref(movies_df, lambda _, k=key: cls._cache.pop(k, None)), fingerprint, {})
+            cls._cache[key] = entry
+        results = entry[2]
+        if name not in results:
+            results[name] = compute()
+        return results[name]
+
+    @classmethod
+    def explode(cls, movies_df):
+        """
+        把逗号分隔的标签拆成一行一个标签
+        同一个标签字符串只拆分一次（多次快照的数据里大量重复），再按出现次数加权
+        返回：DataFrame，列为 group（原标签字符串的编号）、tag、weight（该字符串出现的行数）
+        """
+        def compute():
+            raw = movies_df['tags'].dropna().astype(str).value_counts(sort=False)  # 保持首次出现的顺序
+            tags = raw.index.to_series(index=range(len(raw))).str.split(',').explode().str.strip()
+            exploded = pd.DataFrame({'group': tags.index, 'tag': tags.to_numpy(),
+                                     'weight': raw.to_numpy()[tags.index]})
+            return exploded[exploded['tag'].notna() & (exploded['tag'] != '')]
+        return cls._cached(movies_df, 'explode', compute)
+
+    @classmethod
+    def counts(cls, movies_df):
+        """
+        返回：每个标签出现次数的Series，按次数从高到低排列，次数相同的按标签排序
+        （与 SQL 路径的 ORDER BY count DESC, tag 一致，报告不会因为使用的后端不同而变化）
+        """
+        def compute():
+            exploded = cls.explode(movies_df)
+            counts = exploded.groupby('tag', sort=False)['weight'].sum().rename('count')
+            order = counts.reset_index().sort_values(['count', 'tag'], ascending=[False, True]).index
+            return counts.iloc[order]
+        return cls._cached(movies_df, 'counts', compute)
+
+    @classmethod
+    def top(cls, movies_df, n=20):
+        """返回：出现次数最多的 n 个标签，DataFrame 列为 tag、count"""
+        counts = cls.counts(movies_df).head(n)
+        return pd.DataFrame({'tag': counts.index, 'count': counts.to_numpy()})
+
+    @classmethod
+    def cooccurrence(cls, movies_df, n=20):
+        """
+        标签共现统计：同一部电影同时带有两个标签的次数
+        返回：出现次数最多的 n 对标签，DataFrame 列为 tag_a、tag_b、count（tag_a < tag_b）
+        """
+        def compute():
+            tags = cls.explode(movies_df).drop_duplicates(['group', 'tag'])
+            pairs = tags.merge(tags[['group', 'tag']], on='group', suffixes=('_a', '_b'))
+            pairs = pairs[pairs['tag_a'] < pairs['tag_b']]
+            counts = pairs.groupby(['tag_a', 'tag_b'], sort=False)['weight'].sum()
+            return counts.sort_values(ascending=False, kind='stable').rename('count').reset_index()
+        return cls._cached(movies_df, 'cooccurrence', compute).head(n)
+
+
+class CleaningPipeline:
+    """
+    数据清洗流水线：按顺序执行清洗步骤，记录每一步的耗时、内存变化和处理行数
+    步骤默认为 DataProcessor.clean_steps()，可以传入自定义的 (名称, 函数) 列表增删步骤
+    """
+
+    def __init__(self, steps=None, track_memory=True):
+        self.steps = list(steps) if steps is not None else DataProcessor.clean_steps()
+        self.track_memory = track_memory
+        self.context = {'removed': 0}  # 步骤之间共享的状态（移除的重复数、分块去重的已排序哈希数组等）
+        self.stats = {name: {'seconds': 0.0, 'memory_kb': 0.0, 'rows': 0} for name, _ in self.steps}
+
+    def _memory(self, movies_df):
+        """DataFrame 的深度内存占用（字节）；不统计内存时返回0"""
+        return int(movies_df.memory_usage(deep=True).sum()) if self.track_memory else 0
+
+    def run(self, movies_df):
+        """对一个DataFrame依次执行全部步骤，返回清洗后的DataFrame（多次调用时统计量累加）"""
+        for name, step in self.steps:
+            memory_before = self._memory(movies_df)
+            start = time.perf_counter()
+            movies_df = step(movies_df, self.context)
+            elapsed = time.perf_counter() - start
+            stat = self.stats[name]
+            stat['seconds'] += elapsed
+            stat['memory_kb'] += (self._memory(movies_df) - memory_before) / 1024
+            stat['rows'] += len(movies_df)
+        return movies_df
+
+    def run_chunked(self, chunks, votes_max=None):
+        """逐块执行全部步骤并产出清洗后的块；跨块去重，热度按 votes_max 计算"""
+        self.context['seen'] = np.empty(0, dtype=np.uint64)
+        self.context['votes_max'] = votes_max
+        for chunk in chunks:
+            cleaned = self.run(chunk)
+            if len(cleaned):
+                yield cleaned
+
+    def report(self):
+        """返回每一步的统计：耗时（秒）、内存变化（KB）、处理行数"""
+        return pd.DataFrame.from_dict(self.stats, orient='index')
+
+    def print_report(self):
+        """打印每一步的耗时和内存变化"""
+        for name, stat in self.stats.items():
+            memory = f"，内存 {stat['memory_kb']:+.1f} KB" if self.track_memory else ''
+            print(f"    · {name}: {stat['seconds'] * 1000:.1f} ms{memory}")
+
+
+class RunningStats:
+    """
+    流式统计：逐条接收电影数据并累计统计量，不保存原始记录
+    配合 DoubanSpider.iter_movies() 使用，内存占用与数据量无关
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.rating_sum = 0.0
+        self.rating_min = None
+        self.rating_max = None
+        self.total_votes = 0
+        self.tag_counts = Counter()
+        self.director_counts = Counter()
+
+    def add(self, movie):
+        """累计一部电影"""
+        rating = movie.get('rating', 0.0)
+        self.count += 1
+        self.rating_sum += rating
+        self.rating_min = rating if self.rating_min is None else min(self.rating_min, rating)
+        self.rating_max = rating if self.rating_max is None else max(self.rating_max, rating)
+        self.total_votes += movie.get('votes', 0)
+        self.director_counts[movie.get('director', '未知导演')] += 1
+        tags = movie.get('tags') or ''
+        self.tag_counts.update(tag.strip() for tag in tags.split(',') if tag.strip())
+        return self
+
+    def update(self, movies):
+        """累计一批电影"""
+        for movie in movies:
+            self.add(movie)
+        return self
+
+    def summary(self):
+        """返回当前的统计结果"""
+        return {
+            'count': self.count,
+            'rating_mean': self.rating_sum / self.count if self.count else 0.0,
+            'rating_min': self.rating_min,
+            'rating_max': self.rating_max,
+            'total_votes': self.total_votes,
+            'top_tags': self.tag_counts.most_common(10),
+            'top_directors': self.director_counts.most_common(5),
+        }
+# =================================================
@@ -0,0 +1,102 @@
+"""
+豆瓣电影Top250数据分析系统 - 分析报告子系统
+报告聚合统计（SQL下推或pandas回退）与文本报告生成
+"""
+
+import sqlite3  # SQL聚合失败时的异常类型
+from datetime import datetime  # 日期时间处理
+from douban_processing import DataProcessor, TagAnalytics  # 评分等级标签、标签计数
+
+# ==================== 分析报告模块 ====================
+class AnalysisReporter:
+    """生成分析报告类"""
+
+    # 报告只用到这些列（pandas 回退路径从数据库读取时只取这些列）
+    REPORT_COLUMNS = ['rank', 'rating', 'votes', 'rating_category', 'year', 'director', 'tags']
+
+    @staticmethod
+    def compute_aggregates(movies_df, top_directors=5, top_tags=10):
+        """用pandas计算分析报告需要的聚合统计（SQL聚合不可用时的回退路径）"""
+        rating_dist = movies_df['rating_category'].value_counts()
+        decade_counts = (movies_df['year'].dropna() // 10 * 10).astype(int).value_counts().sort_index()
+        # 与SQL路径相同的排序：作品数降序，并列时按导演最好的排名、再按姓名
+        director_ranks = movies_df[['director', 'rank']].astype({'director': object})
+        director_counts = (director_ranks.groupby('director')['rank'].agg(['size', 'min']).reset_index()
+                           .sort_values(['size', 'min', 'director'], ascending=[False, True, True])
+                           .head(top_directors))
+
+        return {
+            'count': len(movies_df),
+            'rating_mean': movies_df['rating'].mean(), 'rating_median': movies_df['rating'].median(),
+            'rating_max': movies_df['rating'].max(), 'rating_min': movies_df['rating'].min(),
+            'votes_sum': movies_df['votes'].sum(), 'votes_mean': movies_df['votes'].mean(),
+            'votes_median': movies_df['votes'].median(),
+            'rating_dist': [(label, int(rating_dist.get(label, 0))) for label in DataProcessor.RATING_LABELS],
+            'decades': list(decade_counts.items()),
+            'directors': [(director, int(count)) for director, count
+                          in zip(director_counts['director'], director_counts['size'])],
+            'tags': list(TagAnalytics.counts(movies_df).head(top_tags).items()),
+        }
+
+    @staticmethod
+    def generate_report(movies_df=None, db_manager=None):
+        """
+        生成文本分析报告
+        参数：传入 db_manager 时聚合统计在SQLite中计算；SQL执行失败或未传入时用 movies_df 在pandas中计算
+        """
+        stats = None
+        if db_manager is not None:
+            try:
+                stats = db_manager.report_aggregates()
+            except sqlite3.Error as e:
+                print(f"  ⚠️ SQL聚合失败，回退到pandas计算: {e}")
+        if stats is None:
+            if movies_df is None:
+                movies_df = db_manager.get_analysis_data(AnalysisReporter.REPORT_COLUMNS)
+            stats = AnalysisReporter.compute_aggregates(movies_df)
+
+        total = stats['count']
+        report = ["豆瓣电影Top250榜单 **前50名（前20%）** 分析报告", "=" * 60,
+                  f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                  f"分析范围: Top250榜单的前 {total} 部电影（前{total / 250 * 100:.0f}%）",
+                  f"数据总量: {total} 部电影", "-" * 60, "📈 基本统计信息:",
+                  f"  平均评分: {stats['rating_mean']:.2f}", f"  评分中位数: {stats['rating_median']:.2f}",
+                  f"  最高评分: {stats['rating_max']:.2f}", f"  最低评分: {stats['rating_min']:.2f}"]
+
+        # 基本统计
+        report.append(f"  评价人数总和 (前{total}部): {stats['votes_sum']:,}")
+        report.append(f"  平均每部评价人数: {stats['votes_mean']:,.0f}")
+        report.append(f"  评价人数中位数: {stats['votes_median']:,.0f}")
+
+        # 评分分布
+        report.append("\n🏆 评分分布:")
+        for category, count in stats['rating_dist']:
+            percentage = (count / total) * 100
+            report.append(f"  {category}: {count} 部 ({percentage:.1f}%)")
+
+        # 年代分析
+        report.append("\n📅 年代分析:")
+        for decade, count in stats['decades']:
+            if decade > 1900:
+                report.append(f"  {decade}s: {count} 部")
+
+        # 导演分析
+        report.append("\n🎬 导演作品数量Top5:")
+        for director, count in stats['directors']:
+            report.append(f"  {director}: {count} 部")
+
+        # 热门标签
+        report.append("\n🏷️  热门标签Top10:")
+        for tag, count in stats['tags']:
+            report.append(f"  {tag}: {count} 次")
+
+        report.append("=" * 60)
+
+        # 保存报告到文件
+        report_text = '\n'.join(report)
+        with open('analysis_report.txt', 'w', encoding='utf-8') as f:
+            f.write(report_text)
+
+        print("📝 分析报告已保存为 analysis_report.txt")
+        print("\n" + report_text[:500] + "...\n")  # 打印报告开头部分
+# =================================================
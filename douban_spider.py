@@ -0,0 +1,836 @@
+"""
+豆瓣电影Top250数据分析系统 - 爬虫子系统
+列表页的顺序/异步/流水线抓取与解析（bs4 / lxml 两种后端），详情页抓取
+只在需要爬取时才导入网络和HTML解析相关的库
+"""
+
+from bs4 import BeautifulSoup, SoupStrainer  # 用于解析HTML文档；SoupStrainer 只构建需要的子树
+from lxml import etree, html as lxml_html  # lxml/XPath 快速解析后端
+import re  # 正则表达式
+from datetime import datetime  # 日期时间处理
+import asyncio  # 异步并发爬取
+import time  # 等待熔断冷却
+import os  # 文件路径
+import json  # 读取缓存元数据
+import queue  # 抓取与解析之间的有界队列
+import threading  # 抓取线程
+from collections import deque  # 按顺序等待解析结果
+from contextlib import ExitStack  # 没有传入进程池时自己创建并在结束时关闭
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor  # 解析进程池、抓取线程池
+from urllib.parse import urlsplit, parse_qs  # 从缓存URL中取出分页参数
+from douban_config import Config  # 项目配置
+from douban_net import (get_scheduler, ResponseCache, RetryPolicy, CircuitBreaker,  # 限速、缓存、重试、熔断
+                        create_session, fetch_text)  # 共享传输会话
+
+# ==================== 爬虫模块 ====================
+class DoubanSpider:
+    """豆瓣爬虫核心类，负责爬取和解析豆瓣电影Top250数据"""
+
+    def __init__(self, scheduler=None, cache=None):
+        """
+        初始化方法，创建会话并设置请求头
+        参数：scheduler 限速调度器，不传则使用共享调度器（第一次创建时按 Config 设置速率）
+             cache 响应缓存，不传则按 Config 创建（CACHE_ENABLED=False 时不使用缓存）
+        """
+        # 创建持久会话：列表页和详情页复用同一个连接池（keep-alive、压缩、可选HTTP/2）
+        self.session = create_session(Config.POOL_SIZE, Config.HEADERS, Config.HTTP2)
+        # 与 test.py 等其他抓取脚本共用进程内的调度器，同一主机只有一个令牌桶
+        self.scheduler = scheduler or get_scheduler(Config.RATE_LIMIT, Config.RATE_BURST)
+        if cache is None and Config.CACHE_ENABLED:
+            cache = ResponseCache(Config.CACHE_DIR, Config.CACHE_TTL,
+                                  Config.CACHE_MAX_MB * 1024 * 1024, Config.CACHE_OFFLINE)
+        self.cache = cache
+        self.retry = RetryPolicy(Config.MAX_RETRIES, Config.RETRY_BASE_DELAY, Config.RETRY_MAX_DELAY)
+        self.breaker = CircuitBreaker(Config.BREAKER_THRESHOLD, Config.BREAKER_RESET)
+        self.dead_letters = []  # 重试后仍失败的请求 [{'url', 'params', 'error'}]，在爬取结束时重新排队
+        self.details = {}  # fetch_details 解析出的详情页结构化字段 {url: parse_detail 的结果}，存储时写入 movie_details 表
+
+    def _request(self, url, params=None, wait=True):
+        """
+        请求URL：未过期的缓存直接返回；否则按令牌限速后发送（过期缓存带条件请求头），
+        失败时按重试策略退避重试，并把状态码反馈给调度器和熔断器
+        参数：wait=False 表示调用方已经等待过令牌
+        返回HTML页面内容或None（如果请求失败，同时记入 dead_letters）
+        """
+        try:
+            return fetch_text(self.session.get, url, params=params, timeout=15,
+                              cache=self.cache, scheduler=self.scheduler, wait=wait,
+                              retry=self.retry, breaker=self.breaker)
+        except Exception as e:
+            print(f"❌ 获取页面失败 ({url}, {params}): {e}")
+            self.dead_letters.append({'url': url, 'params': params, 'error': str(e)})
+            return None
+
+    def requeue_dead_letters(self, urls=None):
+        """
+        把失败的请求重新排队再试一次（熔断中的主机会先等到冷却结束）
+        参数：urls 只重试这些URL（None 表示全部）
+        返回：[(url, params, html)]，再次失败的请求 html 为 None 并重新记入 dead_letters
+        """
+        letters = [d for d in self.dead_letters if urls is None or d['url'] in urls]
+        if not letters:
+            return []
+        self.dead_letters = [d for d in self.dead_letters if not (urls is None or d['url'] in urls)]
+        print(f"  🔁 重新排队 {len(letters)} 个失败的请求...")
+        results = []
+        for letter in letters:
+            remaining = self.breaker.remaining(letter['url'])
+            if remaining > 0:
+                time.sleep(remaining)
+            results.append((letter['url'], letter['params'], self.fetch_url(letter['url'], letter['params'])))
+        return results
+
+    def fetch_url(self, url, params=None):
+        """请求任意URL，发送前等待该主机的令牌（缓存命中时不等待）"""
+        return self._request(url, params)
+
+    def fetch_page(self, start=0):
+        """
+        获取单页数据
+        start参数表示从第几部电影开始（豆瓣的分页参数）
+        返回HTML页面内容或None（如果请求失败）
+        """
+        params = {'start': start, 'filter': ''}  # 请求参数
+        return self.fetch_url(Config.BASE_URL, params=params)
+
+    @staticmethod
+    def parse_movie_item(item):
+        """
+        解析单个电影条目
+        参数：BeautifulSoup解析出的单个电影条目
+        返回：包含电影信息的字典
+        """
+        global re  # 声明re为全局变量，因为函数内部需要导入re模块
+
+        # 初始化电影信息字典，设置默认值
+        movie = {
+            'rank': 0,  # 排名
+            'title': '未知标题',  # 电影标题
+            'rating': 0.0,  # 评分
+            'votes': 0,  # 评价人数
+            'director': '未知导演',  # 导演
+            'year': 0,  # 上映年份
+            'country': '未知国家/地区',  # 国家/地区
+            'tags': '',  # 标签
+            'quote': '',  # 经典台词/简介
+            'url': '',  # 电影详情页URL
+            'image_url': ''  # 电影封面图片URL
+        }
+
+        try:
+            # 1. 解析排名（最稳定的选择器）
+            rank_elem = item.find('em')  # 排名通常用<em>标签表示
+            if rank_elem:
+                movie['rank'] = int(rank_elem.get_text(strip=True))
+
+            # 2. 解析标题
+            title_elem = item.find('span', class_='title')
+            if title_elem:
+                movie['title'] = title_elem.get_text(strip=True)
+
+            # 3. 解析评分与评价人数
+            # 3.1 提取评分 - 从 property="v:average" 的属性中获取
+            rating_elem = item.find('span', {'property': 'v:average'})
+            if rating_elem:
+                try:
+                    movie['rating'] = float(rating_elem.get_text(strip=True))
+                except ValueError:
+                    movie['rating'] = 0.0
+            else:
+                # 备用方案：尝试旧的 class 选择器
+                backup_elem = item.find('span', class_='rating_num')
+                if backup_elem:
+                    try:
+                        movie['rating'] = float(backup_elem.get_text(strip=True))
+                    except ValueError:
+                        movie['rating'] = 0.0
+                else:
+                    movie['rating'] = 0.0
+
+            # 3.2 提取评价人数 - 它在评分所在的div内，是下一个span
+            rating_div = rating_elem.parent if rating_elem else None
+            movie['votes'] = 0  # 默认值
+            if rating_div:
+                # 找到这个div里所有的span
+                all_spans = rating_div.find_all('span')
+                for span in all_spans:
+                    text = span.get_text(strip=True)
+                    if '人评价' in text:
+                        # 提取数字
+                        import re  # 在需要时导入re模块
+                        num_match = re.search(r'(\d+)', text.replace(',', ''))
+                        if num_match:
+                            movie['votes'] = int(num_match.group(1))
+                        break
+
+            # 4. 提取简介/台词
+            quote_candidate = None
+            for span in item.find_all('span'):
+                txt = span.get_text(strip=True)
+                # 台词通常较短，且包含标点
+                if 50 > len(txt) > 4 and ('。' in txt or '，' in txt):
+                    quote_candidate = txt
+                    break
+            movie['quote'] = quote_candidate if quote_candidate else ''
+
+            # 5. 提取链接和图片
+            link_elem = item.find('a')
+            if link_elem and 'href' in link_elem.attrs:
+                movie['url'] = link_elem['href']
+
+            img_elem = item.find('img')
+            if img_elem and 'src' in img_elem.attrs:
+                movie['image_url'] = img_elem['src']
+
+            # 6. 提取导演、年份、国家等信息（从bd信息块解析）
+            bd_div = item.find('div', class_='bd')
+            if bd_div:
+                info_text = bd_div.get_text(' ', strip=True)
+                # 使用正则表达式提取信息
+                # 导演
+                director_match = re.search(r'导演:\s*(\S+)', info_text)
+                if director_match:
+                    movie['director'] = director_match.group(1)
+                # 年份（寻找4位数字）
+                year_match = re.search(r'\b(19\d{2}|20\d{2})\b', info_text)
+                if year_match:
+                    movie['year'] = int(year_match.group(1))
+                # 国家（简化处理）
+                if '/' in info_text:
+                    parts = [p.strip() for p in info_text.split('/')]
+                    if len(parts) > 2:
+                        movie['country'] = parts[-2]  # 通常国家在倒数第二部分
+
+            # 7. 提取标签
+            tag_list = []
+            for span in item.find_all('span'):
+                if 'class' in span.attrs and len(span['class']) == 1:
+                    cls = span['class'][0]
+                    # 排除已知的其他类
+                    if cls not in ['title', 'rating_num', 'inq', 'playable']:
+                        tag_text = span.get_text(strip=True)
+                        if tag_text and len(tag_text) < 8:  # 标签通常较短
+                            tag_list.append(tag_text)
+            movie['tags'] = ','.join(tag_list[:3])  # 最多取3个标签
+
+        except Exception as e:
+            # 即使解析出错，也返回一个带有默认值的完整字典
+            print(f"⚠️  解析电影条目时遇到小问题（不影响整体）: {e}")
+
+        # 8. 添加爬取时间戳
+        movie['crawl_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return movie
+
+    # lxml 后端使用的预编译选择器（与 find_all('div', class_='item') 等价：class 中包含 item）
+    _ITEM_XPATH = etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' item ')]")
+    _VOTES_RE = re.compile(r'(\d+)')
+    _DIRECTOR_RE = re.compile(r'导演:\s*(\S+)')
+    _YEAR_RE = re.compile(r'\b(19\d{2}|20\d{2})\b')
+
+    @staticmethod
+    def _text(elem, sep=''):
+        """lxml 版的 get_text(sep, strip=True)：每段文本去空白后用 sep 拼接"""
+        return sep.join(t.strip() for t in elem.itertext() if t.strip())
+
+    @staticmethod
+    def parse_movie_item_lxml(item):
+        """
+        解析单个电影条目（lxml后端）
+        对条目只遍历一次，收集所有需要的元素，再按 parse_movie_item 相同的规则取值
+        参数：lxml解析出的单个电影条目元素
+        返回：与 parse_movie_item 结构和取值完全一致的字典
+        """
+        movie = {
+            'rank': 0, 'title': '未知标题', 'rating': 0.0, 'votes': 0,
+            'director': '未知导演', 'year': 0, 'country': '未知国家/地区',
+            'tags': '', 'quote': '', 'url': '', 'image_url': ''
+        }
+
+        # 一次遍历收集元素
+        em = title = average = rating_num = link = img = bd = None
+        spans = []  # [(元素, class列表)]，按文档顺序
+        for elem in item.iterdescendants():
+            tag = elem.tag
+            if tag == 'span':
+                classes = elem.get('class')
+                classes = classes.split() if classes is not None else None
+                spans.append((elem, classes))
+                if title is None and classes and 'title' in classes:
+                    title = elem
+                if average is None and elem.get('property') == 'v:average':
+                    average = elem
+                if rating_num is None and classes and 'rating_num' in classes:
+                    rating_num = elem
+            elif tag == 'em' and em is None:
+                em = elem
+            elif tag == 'a' and link is None:
+                link = elem
+            elif tag == 'img' and img is None:
+                img = elem
+            elif tag == 'div' and bd is None and 'bd' in (elem.get('class') or '').split():
+                bd = elem
+
+        text = DoubanSpider._text
+        texts = {}  # span -> get_text(strip=True)，每个span只取一次文本
+
+        def span_text(elem):
+            if elem not in texts:
+                texts[elem] = text(elem)
+            return texts[elem]
+
+        try:
+            # 1. 排名
+            if em is not None:
+                movie['rank'] = int(text(em))
+
+            # 2. 标题
+            if title is not None:
+                movie['title'] = span_text(title)
+
+            # 3.1 评分
+            rating_elem = average if average is not None else rating_num
+            if rating_elem is not None:
+                try:
+                    movie['rating'] = float(span_text(rating_elem))
+                except ValueError:
+                    movie['rating'] = 0.0
+
+            # 3.2 评价人数（评分所在div内的span）
+            if average is not None:
+                for span in average.getparent().iterdescendants('span'):
+                    txt = span_text(span)
+                    if '人评价' in txt:
+                        num_match = DoubanSpider._VOTES_RE.search(txt.replace(',', ''))
+                        if num_match:
+                            movie['votes'] = int(num_match.group(1))
+                        break
+
+            # 4. 简介/台词
+            for span, _ in spans:
+                txt = span_text(span)
+                if 50 > len(txt) > 4 and ('。' in txt or '，' in txt):
+                    movie['quote'] = txt
+                    break
+
+            # 5. 链接和图片
+            if link is not None and link.get('href') is not None:
+                movie['url'] = link.get('href')
+            if img is not None and img.get('src') is not None:
+                movie['image_url'] = img.get('src')
+
+            # 6. 导演、年份、国家
+            if bd is not None:
+                info_text = text(bd, ' ')
+                director_match = DoubanSpider._DIRECTOR_RE.search(info_text)
+                if director_match:
+                    movie['director'] = director_match.group(1)
+                year_match = DoubanSpider._YEAR_RE.search(info_text)
+                if year_match:
+                    movie['year'] = int(year_match.group(1))
+                if '/' in info_text:
+                    parts = [p.strip() for p in info_text.split('/')]
+                    if len(parts) > 2:
+                        movie['country'] = parts[-2]
+
+            # 7. 标签
+            tag_list = []
+            for span, classes in spans:
+                if classes is not None and len(classes) == 1 \
+                        and classes[0] not in ['title', 'rating_num', 'inq', 'playable']:
+                    tag_text = span_text(span)
+                    if tag_text and len(tag_text) < 8:
+                        tag_list.append(tag_text)
+            movie['tags'] = ','.join(tag_list[:3])
+
+        except Exception as e:
+            print(f"⚠️  解析电影条目时遇到小问题（不影响整体）: {e}")
+
+        movie['crawl_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return movie
+
+    @staticmethod
+    def _has_item_class(value):
+        """
+        SoupStrainer 的 class 匹配：class 中包含 item 这个词即可（与 find_all(class_='item') 一致）
+        建树时拿到的是完整的 class 字符串，直接写 class_='item' 会漏掉 "item xxx" 这样带多个class的条目
+        """
+        return value is not None and 'item' in value.split()
+
+    @classmethod
+    def parse_list_page(cls, html, backend=None, restricted=None):
+        """
+        解析一个列表页
+        参数：html 页面文本；backend 解析后端 'bs4' 或 'lxml'（默认取 Config.PARSER_BACKEND）
+             restricted bs4后端是否只构建 div.item 子树（默认取 Config.RESTRICTED_PARSE）
+        返回：电影字典列表
+        """
+        backend = backend or Config.PARSER_BACKEND
+        if backend == 'lxml':
+            root = lxml_html.fromstring(html)
+            return [cls.parse_movie_item_lxml(item) for item in cls._ITEM_XPATH(root)]
+
+        if restricted is None:
+            restricted = Config.RESTRICTED_PARSE
+        parse_only = SoupStrainer('div', class_=cls._has_item_class) if restricted else None
+        soup = BeautifulSoup(html, 'lxml', parse_only=parse_only)  # 使用lxml解析器解析HTML
+        items = soup.find_all('div', class_='item')  # 找到所有电影条目
+        return [cls.parse_movie_item(item) for item in items]
+
+    @classmethod
+    def check_parser_parity(cls, cache_dir=None, pages=None):
+        """
+        解析器一致性检查：用 lxml 后端和只建 div.item 子树的 bs4 分别解析列表页，与完整的 bs4 解析逐条比对
+        参数：cache_dir 缓存目录（默认 Config.CACHE_DIR）；pages 直接给出 [(页面名, HTML)]，不读缓存
+        返回：不一致的条目列表 [(页面URL, 完整解析结果, 对比结果)]，为空表示完全一致；
+              一个页面都没有比较时也视为失败（返回一条说明），避免空缓存被当成“一致”
+        """
+        mismatches = []
+        compared = 0
+        for page_url, html in (cls.cached_list_pages(cache_dir) if pages is None else pages):
+            compared += 1
+            expected = cls.parse_list_page(html, 'bs4', restricted=False)
+            # lxml 后端和只构建 div.item 子树的 bs4 都必须与完整解析的结果一致
+            for actual in (cls.parse_list_page(html, 'lxml'), cls.parse_list_page(html, 'bs4', restricted=True)):
+                if len(expected) != len(actual):
+                    mismatches.append((page_url, len(expected), len(actual)))
+                    continue
+                for a, b in zip(expected, actual):
+                    a, b = dict(a, crawl_time=None), dict(b, crawl_time=None)  # 时间戳不参与比较
+                    if a != b:
+                        mismatches.append((page_url, a, b))
+        if not compared:
+            print(f"❌ 解析器一致性检查：{cache_dir or Config.CACHE_DIR} 中没有可比较的列表页")
+            return [(cache_dir or Config.CACHE_DIR, '没有可比较的列表页', None)]
+        print(f"🔍 解析器一致性检查：{compared} 个页面，{len(mismatches)} 处不一致")
+        return mismatches
+
+    @staticmethod
+    def cached_list_pages(cache_dir=None):
+        """
+        逐个读取缓存目录中保存的列表页
+        先只读元数据确定顺序，正文在迭代到该页时才读入，同一时刻只有一页HTML在内存中
+        参数：cache_dir 缓存目录（默认 Config.CACHE_DIR）
+        返回：生成器，按 start 参数（即排名）顺序产出 (页面URL, HTML)
+        """
+        cache_dir = cache_dir or Config.CACHE_DIR
+        if not os.path.isdir(cache_dir):
+            return  # 还没有缓存过任何页面
+        pages = []
+        for name in os.listdir(cache_dir):
+            if not name.endswith('.json'):
+                continue
+            with open(os.path.join(cache_dir, name), encoding='utf-8') as f:
+                page_url = json.load(f)['url']
+            if not page_url.startswith(Config.BASE_URL):
+                continue  # 只要列表页
+            start = int(parse_qs(urlsplit(page_url).query).get('start', ['0'])[0])
+            pages.append((start, page_url, os.path.join(cache_dir, name[:-len('.json')] + '.html')))
+        for _, page_url, body_path in sorted(pages):
+            try:
+                with open(body_path, encoding='utf-8') as f:
+                    html = f.read()
+            except OSError:
+                continue  # 元数据在但正文已被淘汰
+            yield page_url, html
+
+    @classmethod
+    def parse_pages_parallel(cls, pages, workers=None, backend=None, restricted=None, pool=None):
+        """
+        用进程池并行解析列表页，结果按输入顺序（即排名顺序）逐页返回
+        同时在途的页面数不超过进程数的2倍，输入可以是边抓取边产生的生成器
+        参数：pages 可迭代的HTML文本；workers 进程数（默认 Config.PIPELINE_WORKERS）；
+              pool 调用方已经启动的进程池（不传时新建，用完关闭）
+        返回：生成器，每次产出一页的电影字典列表
+        """
+        workers = workers or Config.PIPELINE_WORKERS or os.cpu_count()
+        backend = backend or Config.PARSER_BACKEND
+        restricted = Config.RESTRICTED_PARSE if restricted is None else restricted
+        with ExitStack() as stack:
+            if pool is None:
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            pending = deque()
+            for html in pages:
+                pending.append(pool.submit(_parse_page_job, html, backend, restricted))
+                while len(pending) >= workers * 2 or (pending and pending[0].done()):
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def crawl_pipeline(self, fetch_details=None):
+        """
+        流水线爬取：抓取线程把原始HTML放入有界队列，解析进程池消费，按排名顺序汇总
+        参数：fetch_details 是否再抓取详情页（默认取 Config.FETCH_DETAILS）
+        返回：包含所有电影信息的列表
+        """
+        if fetch_details is None:
+            fetch_details = Config.FETCH_DETAILS
+        workers = Config.PIPELINE_WORKERS or os.cpu_count()
+        print(f"🎬 开始流水线爬取豆瓣电影Top250（解析进程 {workers} 个）...")
+        html_queue = queue.Queue(maxsize=Config.PIPELINE_QUEUE_SIZE)
+        done = object()  # 结束标记
+
+        def produce():
+            starts = [page * 25 for page in range(Config.MAX_PAGES)]
+            window = Config.CONCURRENCY * 2  # 同时在途（已提交、结果还没放进队列）的抓取数上限
+
+            def put(future):
+                html = future.result()
+                if html:
+                    html_queue.put(html)  # 队列满时在这里等待解析进度，也就不再提交新的抓取
+
+            try:
+                # 按提交顺序取回结果，抓取本身可以并发；窗口有界，解析跟不上时抓取随之暂停
+                with ThreadPoolExecutor(max_workers=Config.CONCURRENCY) as fetchers:
+                    pending = deque()
+                    for start in starts:
+                        pending.append(fetchers.submit(self.fetch_page, start))
+                        while len(pending) >= window:
+                            put(pending.popleft())
+                    while pending:
+                        put(pending.popleft())
+                for _, _, html in self.requeue_dead_letters({Config.BASE_URL}):
+                    if html:
+                        html_queue.put(html)  # 失败的页面排在最后
+            finally:
+                html_queue.put(done)
+
+        def consume():
+            while True:
+                html = html_queue.get()
+                if html is done:
+                    return
+                yield html
+
+        all_movies = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # 先启动全部解析进程，再开抓取线程：fork 时其他线程可能正持有锁（连接池、调度器、队列），
+            # 子进程里的锁永远不会被释放而导致死锁（fork 方式下第一次提交任务时一次性创建全部进程）
+            pool.submit(int).result()
+            producer = threading.Thread(target=produce, daemon=True)
+            producer.start()
+            for movies in self.parse_pages_parallel(consume(), workers, pool=pool):
+                all_movies.extend(movies)
+                print(f"  ✓ 解析完成一页，累计 {len(all_movies)} 部电影")
+            producer.join()
+
+        if fetch_details:
+            self.fetch_details(all_movies)
+        print(f"✅ 爬取完成！共获取 {len(all_movies)} 部电影数据")
+        self._report_dead_letters()
+        return all_movies
+
+    @classmethod
+    def reparse_cached_pages(cls, cache_dir=None, workers=None):
+        """
+        用进程池重新解析缓存中的所有列表页（不访问网络），用于批量重处理历史页面
+        返回：按排名顺序排列的电影字典列表
+        """
+        all_movies = []
+        page_count = 0
+        for movies in cls.parse_pages_parallel((html for _, html in cls.cached_list_pages(cache_dir)), workers):
+            all_movies.extend(movies)
+            page_count += 1
+        print(f"✅ 重新解析 {page_count} 个缓存页面，共 {len(all_movies)} 部电影")
+        return all_movies
+
+    def iter_pages(self):
+        """
+        逐页爬取并解析，每解析完一页就产出该页的电影列表
+        返回：生成器，每次产出一页的电影字典列表
+        """
+        for page in range(Config.MAX_PAGES):
+            start = page * 25  # 每页25部电影
+            print(f"  正在爬取第 {page + 1} 页 (start={start})...")
+
+            html = self.fetch_page(start)
+            if not html:
+                continue  # 如果获取页面失败，跳过当前页
+
+            movies = self.parse_list_page(html)
+            yield movies
+
+            if len(movies) < 25:  # 最后一页可能不足25部
+                break
+
+        # 失败的列表页在最后重新排队
+        for _, _, html in self.requeue_dead_letters({Config.BASE_URL}):
+            if html:
+                yield self.parse_list_page(html)
+
+    def iter_movies(self, batch=False):
+        """
+        流式API：第一页解析完就开始产出结果，不在内存中累积全部数据
+        参数：batch=True 时按页产出列表，否则逐部电影产出字典
+        """
+        for movies in self.iter_pages():
+            if batch:
+                yield movies
+            else:
+                yield from movies
+
+    def crawl_all_pages(self):
+        """
+        爬取所有页面数据
+        返回：包含所有电影信息的列表
+        """
+        all_movies = []
+        print("🎬 开始爬取豆瓣电影Top250...")
+
+        for movies in self.iter_pages():
+            all_movies.extend(movies)
+            print(f"  ✓ 本页完成，累计 {len(all_movies)} 部电影")
+
+        print(f"✅ 爬取完成！共获取 {len(all_movies)} 部电影数据")
+        self._report_dead_letters()
+        return all_movies
+
+    def _report_dead_letters(self):
+        """爬取结束时提示仍然失败的请求"""
+        if self.dead_letters:
+            print(f"⚠️  重新排队后仍有 {len(self.dead_letters)} 个请求失败：")
+            for letter in self.dead_letters:
+                print(f"    {letter['url']} {letter['params'] or ''} - {letter['error']}")
+
+    async def fetch_url_async(self, url, semaphore, params=None):
+        """
+        异步请求单个URL
+        信号量限制同时在途的请求数，令牌桶控制每个主机的速率，
+        实际的阻塞IO放到线程中执行，复用同一个Session连接池
+        """
+        if self.cache is not None:
+            html = self.cache.get_fresh(url, params)
+            if html is not None:
+                return html  # 缓存命中，不占用并发名额也不消耗令牌
+        async with semaphore:
+            if self.cache is None or not self.cache.offline:
+                await self.scheduler.wait_async(url)
+            return await asyncio.to_thread(self._request, url, params, False)
+
+    @staticmethod
+    def parse_summary(html, restricted=None):
+        """
+        从详情页中提取剧情简介，找不到时返回空字符串
+        参数：restricted 是否只构建简介所在的span（默认取 Config.RESTRICTED_PARSE）
+        """
+        if restricted is None:
+            restricted = Config.RESTRICTED_PARSE
+        parse_only = SoupStrainer('span', property='v:summary') if restricted else None
+        soup = BeautifulSoup(html, 'lxml', parse_only=parse_only)
+        summary_tag = soup.find('span', property='v:summary')
+        return summary_tag.get_text(strip=True) if summary_tag else ''
+
+    # 详情页使用的预编译选择器：一次取出所有带 v: 微数据（property/rel）的元素
+    _MICRODATA_XPATH = etree.XPath("//*[starts-with(@property, 'v:') or starts-with(@rel, 'v:')]")
+    _FULL_SUMMARY_XPATH = etree.XPath("//span[.//span[@property='v:summary']]"
+                                      "/following-sibling::span[contains(concat(' ', normalize-space(@class), ' '), ' all ')]")
+    _LABEL_XPATH = etree.XPath("//div[@id='info']//span[@class='pl']")
+    _STARS_XPATH = etree.XPath("//div[contains(@class, 'ratings-on-weight')]/div[contains(@class, 'item')]")
+    _IMDB_RE = re.compile(r'(tt\d+)')
+    _STARS_RE = re.compile(r'stars(\d)')
+    _NUMBER_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+    @classmethod
+    def parse_detail(cls, html, url=''):
+        """
+        解析详情页的结构化字段（lxml，按 v: 微数据属性取值）
+        返回：字典，包含 url、title、directors、starring、genres（多个值用 / 连接）、runtime（分钟）、
+              release_date、imdb_id、rating、votes、star5~star1（各星级占比%）、完整的 summary
+        """
+        detail = {
+            'url': url, 'title': '', 'directors': '', 'starring': '', 'genres': '', 'runtime': None,
+            'release_date': '', 'imdb_id': '', 'rating': None, 'votes': None,
+            'star5': None, 'star4': None, 'star3': None, 'star2': None, 'star1': None,
+            'summary': '', 'fetch_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        root = lxml_html.fromstring(html)
+        text = cls._text
+
+        microdata = {}  # 'v:genre' -> [元素, ...]，按文档顺序
+        for elem in cls._MICRODATA_XPATH(root):
+            microdata.setdefault(elem.get('property') or elem.get('rel'), []).append(elem)
+
+        def values(name):
+            return [text(elem) for elem in microdata.get(name, []) if text(elem)]
+
+        def first(name, attr=None):
+            elems = microdata.get(name)
+            if not elems:
+                return ''
+            return (elems[0].get(attr) if attr else None) or text(elems[0])
+
+        detail['title'] = first('v:itemreviewed')
+        detail['directors'] = '/'.join(values('v:directedBy'))
+        detail['starring'] = '/'.join(values('v:starring'))
+        detail['genres'] = '/'.join(values('v:genre'))
+        detail['release_date'] = first('v:initialReleaseDate', 'content')
+
+        runtime = cls._NUMBER_RE.search(first('v:runtime', 'content'))  # content 为分钟数，没有时从“142分钟”中取
+        if runtime:
+            detail['runtime'] = int(float(runtime.group(1)))
+        try:
+            detail['rating'] = float(first('v:average'))
+        except ValueError:
+            pass
+        votes = cls._NUMBER_RE.search(first('v:votes').replace(',', ''))
+        if votes:
+            detail['votes'] = int(float(votes.group(1)))
+
+        # IMDb 编号没有微数据，是 “IMDb:” 标签后面的文本
+        for label in cls._LABEL_XPATH(root):
+            if text(label).startswith('IMDb'):
+                match = cls._IMDB_RE.search(label.tail or '')
+                if match:
+                    detail['imdb_id'] = match.group(1)
+                break
+
+        # 评分分布：每个星级一行，class 为 starsN，占比在 rating_per 中
+        for item in cls._STARS_XPATH(root):
+            stars = percent = None
+            for span in item.iterdescendants('span'):
+                classes = span.get('class') or ''
+                match = cls._STARS_RE.search(classes)
+                if match:
+                    stars = match.group(1)
+                elif 'rating_per' in classes:
+                    percent = cls._NUMBER_RE.search(text(span))
+            if stars and percent and f'star{stars}' in detail:
+                detail[f'star{stars}'] = float(percent.group(1))
+
+        # 简介较长时 v:summary 只有折叠后的部分，完整内容在 span.all 中
+        full = cls._FULL_SUMMARY_XPATH(root)
+        summary = full[0] if full else (microdata.get('v:summary') or [None])[0]
+        if summary is not None:
+            detail['summary'] = text(summary, '\n')
+        return detail
+
+    async def crawl_all_pages_async(self, fetch_details=None):
+        """
+        异步并发爬取所有页面数据
+        所有列表页同时发出（受 Config.CONCURRENCY 限制），解析仍复用 parse_movie_item
+        参数：fetch_details 是否继续并发抓取详情页（见 fetch_details_async，默认取 Config.FETCH_DETAILS）
+        返回：包含所有电影信息的列表（按页顺序）
+        """
+        if fetch_details is None:
+            fetch_details = Config.FETCH_DETAILS
+        semaphore = asyncio.Semaphore(Config.CONCURRENCY)
+        print(f"🎬 开始并发爬取豆瓣电影Top250（并发数 {Config.CONCURRENCY}）...")
+
+        all_movies = []
+        async for movies in self.aiter_pages(semaphore):
+            all_movies.extend(movies)
+            print(f"  ✓ 本页完成，累计 {len(all_movies)} 部电影")
+
+        if fetch_details:
+            await self.fetch_details_async(all_movies, semaphore)
+
+        print(f"✅ 爬取完成！共获取 {len(all_movies)} 部电影数据")
+        self._report_dead_letters()
+        return all_movies
+
+    async def aiter_pages(self, semaphore=None):
+        """
+        异步流式API：所有列表页并发请求，按排名顺序逐页产出解析结果，
+        第一页到达后即可产出，不必等待最后一页
+        返回：异步生成器，每次产出一页的电影字典列表
+        """
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(Config.CONCURRENCY)
+        starts = [page * 25 for page in range(Config.MAX_PAGES)]  # 每页25部电影
+        tasks = [asyncio.ensure_future(
+            self.fetch_url_async(Config.BASE_URL, semaphore, params={'start': start, 'filter': ''}))
+            for start in starts]
+        try:
+            for task in tasks:
+                html = await task
+                if html:  # 获取失败的页面先跳过，记在 dead_letters 中
+                    yield self.parse_list_page(html)
+            for _, _, html in await asyncio.to_thread(self.requeue_dead_letters, {Config.BASE_URL}):
+                if html:
+                    yield self.parse_list_page(html)
+        finally:
+            for task in tasks:
+                task.cancel()  # 调用方提前停止迭代时，取消尚未完成的请求
+
+    async def aiter_movies(self, batch=False):
+        """
+        异步流式API：逐部电影（batch=True 时逐页）产出解析结果
+        用法：async for movie in spider.aiter_movies(): ...
+        """
+        async for movies in self.aiter_pages():
+            if batch:
+                yield movies
+            else:
+                for movie in movies:
+                    yield movie
+
+    async def crawl_details_async(self, movies, semaphore=None):
+        """
+        并发抓取全部详情页并解析结构化字段
+        并发数受 Config.CONCURRENCY 限制，请求速率仍由每个主机的令牌桶控制，缓存命中的页面不占用名额
+        参数：movies 电影字典列表（需要 url 字段）
+        返回：parse_detail 的结果列表（重新排队后仍失败的详情页不在其中）
+        """
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(Config.CONCURRENCY)
+        urls = list(dict.fromkeys(movie['url'] for movie in movies if movie.get('url')))  # 去重并保持顺序
+        print(f"  正在并发抓取 {len(urls)} 个详情页（并发数 {Config.CONCURRENCY}）...")
+        start = time.perf_counter()
+        pages = dict(zip(urls, await asyncio.gather(*[self.fetch_url_async(url, semaphore) for url in urls])))
+
+        # 失败的详情页重新排队
+        for url, _, html in await asyncio.to_thread(self.requeue_dead_letters, set(urls)):
+            if html:
+                pages[url] = html
+
+        details = []
+        for url, html in pages.items():
+            if not html:
+                continue
+            try:
+                details.append(self.parse_detail(html, url))
+            except Exception as e:
+                print(f"❌ 解析详情页失败 ({url}): {e}")
+        print(f"  ✓ 详情页完成 {len(details)} / {len(urls)}，耗时 {time.perf_counter() - start:.1f} 秒")
+        return details
+
+    def crawl_details(self, movies):
+        """crawl_details_async 的同步入口，结束时提示仍然失败的请求"""
+        details = asyncio.run(self.crawl_details_async(movies))
+        self._report_dead_letters()
+        return details
+
+    async def fetch_details_async(self, movies, semaphore=None):
+        """
+        并发抓取详情页（与 details 阶段相同的 crawl_details_async / parse_detail 流程），
+        为每部电影补充 summary 字段（原地修改），完整的解析结果保存在 self.details 中，
+        由调用方用 DatabaseManager.save_movie_details 写入 movie_details 表
+        参数：movies 电影字典列表
+        """
+        details = await self.crawl_details_async(movies, semaphore)
+        self.details.update((detail['url'], detail) for detail in details)
+        for movie in movies:
+            if movie['url']:
+                detail = self.details.get(movie['url'])
+                movie['summary'] = detail['summary'] if detail else ''
+        return movies
+
+    def fetch_details(self, movies):
+        """fetch_details_async 的同步入口"""
+        return asyncio.run(self.fetch_details_async(movies))
+
+    def crawl(self, fetch_details=None):
+        """
+        根据 Config.ASYNC_CRAWL 选择顺序爬取或异步并发爬取
+        参数：fetch_details 仅对异步/流水线模式有效，默认取 Config.FETCH_DETAILS
+        """
+        if Config.PIPELINE_CRAWL:
+            return self.crawl_pipeline(fetch_details)
+        if Config.ASYNC_CRAWL:
+            return asyncio.run(self.crawl_all_pages_async(fetch_details))
+        return self.crawl_all_pages()
+
+
+def _parse_page_job(html, backend, restricted):
+    """进程池中执行的解析任务（必须是模块级函数才能被pickle）"""
+    return DoubanSpider.parse_list_page(html, backend, restricted)
+# =================================================
@@ -0,0 +1,590 @@
+"""
+豆瓣电影Top250数据分析系统 - 数据存储子系统
+SQLite 存储（UPSERT、增量、历史快照、SQL聚合）与可选的 Parquet 列式存储
+"""
+
+import pandas as pd  # 数据处理库
+import sqlite3  # SQLite数据库操作
+from datetime import datetime  # 日期时间处理
+from douban_config import Config  # 项目配置
+from douban_processing import DataProcessor  # 写库前的类型还原、标签统计
+
+pa = pc = pads = pq = None  # 可选依赖 pyarrow：导入较慢，第一次使用列式存储时才加载
+
+
+def _load_pyarrow():
+    """导入 pyarrow（未安装时抛出 ImportError 并提示安装）"""
+    global pa, pc, pads, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.compute
+            import pyarrow.dataset
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("列式存储需要安装 pyarrow：pip install pyarrow") from None
+        pa, pc, pads, pq = pyarrow, pyarrow.compute, pyarrow.dataset, pyarrow.parquet
+
+# ==================== 数据存储模块 ====================
+class DatabaseManager:
+    """数据库管理类，负责SQLite数据库操作"""
+
+    # movies 表中除自增id外的数据列（写库时只写这些列）
+    MOVIE_COLUMNS = ['rank', 'title', 'rating', 'votes', 'director', 'year', 'country', 'tags', 'quote',
+                     'url', 'image_url', 'summary', 'rating_category', 'popularity', 'crawl_time']
+    # 表建好之后才加入的列：旧数据库打开时用 ALTER TABLE 补上
+    ADDED_COLUMNS = {'movies': {'summary': 'TEXT'}}
+    # movie_details 表的列（与 DoubanSpider.parse_detail 返回的字段一致）
+    DETAIL_COLUMNS = ['url', 'title', 'directors', 'starring', 'genres', 'runtime', 'release_date', 'imdb_id',
+                      'rating', 'votes', 'star5', 'star4', 'star3', 'star2', 'star1', 'summary', 'fetch_time']
+
+    def __init__(self, db_name=Config.DB_NAME, read_only=False):
+        """
+        初始化，连接数据库并创建表
+        参数：read_only=True 时以只读方式打开（用于分析/仪表板，在爬虫写库时并发读取），不建表
+        """
+        if read_only:
+            self.conn = sqlite3.connect(f'file:{db_name}?mode=ro', uri=True)
+        else:
+            self.conn = sqlite3.connect(db_name)  # 连接SQLite数据库
+        self.apply_pragmas(read_only)
+        if not read_only:
+            self.migrate_legacy_tables()  # 旧版 to_sql 覆盖掉的表恢复为声明的表结构
+            self.create_tables()  # 创建数据表
+            self.migrate_added_columns()
+
+    def apply_pragmas(self, read_only=False):
+        """应用 Config.DB_PRAGMAS 中的性能配置（只读连接不能切换日志模式）"""
+        for name, value in Config.DB_PRAGMAS.items():
+            if read_only and name == 'journal_mode':
+                continue
+            self.conn.execute(f"PRAGMA {name} = {value}")
+
+    def create_tables(self):
+        """创建数据表"""
+        cursor = self.conn.cursor()
+
+        # 主电影表
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS movies (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                rank INTEGER,
+                title TEXT NOT NULL,
+                rating REAL,
+                votes INTEGER,
+                director TEXT,
+                year INTEGER,
+                country TEXT,
+                tags TEXT,
+                `quote` TEXT,  -- 这里修改：用反引号包裹（quote是SQL关键字）
+                url TEXT,
+                image_url TEXT,
+                summary TEXT,  -- 详情页剧情简介（抓取了详情页时才有）
+                rating_category TEXT,
+                popularity REAL,
+                crawl_time TEXT,
+                UNIQUE(title)  -- 标题唯一，避免重复
+            )
+        ''')
+
+        # 标签统计表
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tags_stats (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tag TEXT UNIQUE,
+                count INTEGER,
+                update_time TEXT
+            )
+        ''')
+
+        # 分析结果表
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                metric_name TEXT,
+                metric_value REAL,
+                description TEXT,
+                update_time TEXT
+            )
+        ''')
+
+        # 二级索引：按评分/年份/导演/国家/爬取时间过滤和分组时不再全表扫描
+        for column in ('rating', 'year', 'director', 'country', 'crawl_time'):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_movies_{column} ON movies({column})")
+
+        # 爬取批次表：每次爬取一行
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                crawl_time TEXT NOT NULL,
+                movie_count INTEGER
+            )
+        ''')
+
+        # 电影编号表：标题到稳定整数编号的映射（movies 表会删除跌出榜单的电影，编号不能依赖它）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS movie_keys (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL UNIQUE
+            )
+        ''')
+
+        # 历史快照表：按 (电影编号, 爬取批次) 聚簇存储，全部为整数列
+        # 只在排名/评价人数/评分变化时写入新行，值在下一条快照之前一直有效；rank 为NULL表示该次不在榜
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS movie_snapshots (
+                movie_id INTEGER NOT NULL,
+                crawl_id INTEGER NOT NULL,
+                rank INTEGER,
+                votes INTEGER,
+                rating_x10 INTEGER,  -- 评分乘10存为整数，如 9.7 存为 97
+                PRIMARY KEY (movie_id, crawl_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_crawl ON movie_snapshots(crawl_id)")
+
+        # 详情页结构化字段：按详情页URL一行，重新抓取时覆盖
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS movie_details (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                directors TEXT,  -- 多个值用 / 连接，下同
+                starring TEXT,
+                genres TEXT,
+                runtime INTEGER,  -- 片长（分钟）
+                release_date TEXT,
+                imdb_id TEXT,
+                rating REAL,
+                votes INTEGER,
+                star5 REAL,  -- 各星级评分占比（%）
+                star4 REAL,
+                star3 REAL,
+                star2 REAL,
+                star1 REAL,
+                summary TEXT,  -- 完整剧情简介
+                fetch_time TEXT
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_details_imdb ON movie_details(imdb_id)")
+
+        self.conn.commit()  # 提交事务
+
+    def migrate_legacy_tables(self):
+        """
+        旧版本用 to_sql(if_exists='replace') 写库，会把 movies/tags_stats 替换成没有自增id和唯一约束的表。
+        检测到这种表时，按声明的表结构重建并把数据复制回来
+        """
+        legacy = []
+        for table in ('movies', 'tags_stats'):
+            row = self.conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                    (table,)).fetchone()
+            if row and 'AUTOINCREMENT' not in row[0]:
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}_legacy")
+                self.conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+                legacy.append(table)
+        if not legacy:
+            return
+
+        self.create_tables()
+        for table in legacy:
+            new_columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            old_columns = [row[1] for row in self.conn.execute(f"PRAGMA table_info({table}_legacy)")]
+            columns = ', '.join(f'`{c}`' for c in old_columns if c in new_columns and c != 'id')
+            self.conn.execute(f"INSERT OR IGNORE INTO {table} ({columns}) SELECT {columns} FROM {table}_legacy")
+            self.conn.execute(f"DROP TABLE {table}_legacy")
+            print(f"  🔧 已将旧版 {table} 表迁移回声明的表结构")
+        self.conn.commit()
+
+    def migrate_added_columns(self):
+        """给旧数据库补上 ADDED_COLUMNS 中后来新增的列（已有数据保留，新列为NULL）"""
+        for table, added in self.ADDED_COLUMNS.items():
+            existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            for column, column_type in added.items():
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN `{column}` {column_type}")
+                    print(f"  🔧 已为 {table} 表添加 {column} 列")
+        self.conn.commit()
+
+    def _upsert_movies(self, movies_df, batch_size=None):
+        """
+        批量 UPSERT 电影数据（不提交事务，由调用方控制）
+        按标题冲突时更新；除爬取时间外所有列都没变的行跳过，不产生写入
+        参数：batch_size 每次 executemany 的行数（默认 Config.DB_BATCH_SIZE）
+        返回：实际插入或更新的行数
+        """
+        batch_size = batch_size or Config.DB_BATCH_SIZE
+        columns = [c for c in self.MOVIE_COLUMNS if c in movies_df.columns]
+        updates = [c for c in columns if c != 'title']
+        compared = [c for c in updates if c != 'crawl_time']
+        sql = (f"INSERT INTO movies ({', '.join(f'`{c}`' for c in columns)}) "
+               f"VALUES ({', '.join('?' for _ in columns)}) "
+               f"ON CONFLICT(title) DO UPDATE SET {', '.join(f'`{c}` = excluded.`{c}`' for c in updates)}")
+        if compared:
+            sql += f" WHERE {' OR '.join(f'movies.`{c}` IS NOT excluded.`{c}`' for c in compared)}"
+
+        rows = DataProcessor.to_plain(movies_df, columns).astype(object)
+        rows = rows.where(rows.notna(), None)  # NaN 写成 NULL
+        records = list(rows.itertuples(index=False, name=None))
+        cursor = self.conn.cursor()
+        written = 0
+        for i in range(0, len(records), batch_size):
+            # 同一条SQL语句只编译一次，每批参数复用这条预编译语句
+            cursor.executemany(sql, records[i:i + batch_size])
+            written += cursor.rowcount
+        return written
+
+    def _prune_movies(self, titles):
+        """删除不在本次数据中的电影（不提交事务），返回删除的行数"""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_titles (title TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM temp.current_titles")
+        self.conn.executemany("INSERT OR IGNORE INTO temp.current_titles VALUES (?)", ((t,) for t in titles))
+        cursor = self.conn.execute("DELETE FROM movies WHERE title NOT IN (SELECT title FROM temp.current_titles)")
+        return cursor.rowcount
+
+    def save_movies(self, movies_df, prune=True):
+        """
+        保存电影数据到数据库
+        在一个事务中批量 UPSERT，保留 create_tables 声明的表结构；只有变化的行会被写入
+        参数：清洗后的电影DataFrame；prune 是否删除本次数据中没有的旧电影（与原来整表替换的结果一致）
+        """
+        print("💾 正在保存数据到数据库...")
+
+        try:
+            with self.conn:  # 单个事务：全部成功才提交，出错自动回滚
+                written = self._upsert_movies(movies_df)
+                removed = self._prune_movies(movies_df['title']) if prune else 0
+            print(f"  ✓ 成功保存 {len(movies_df)} 条电影记录（实际写入 {written} 条，移除 {removed} 条）")
+
+            # 保存标签统计
+            self.save_tag_stats(movies_df)
+
+        except Exception as e:
+            print(f"❌ 保存数据失败: {e}")
+
+    def save_tag_stats(self, movies_df):
+        """根据完整的电影数据重新计算标签统计，按标签 UPSERT 并删除已不在榜的标签"""
+        tag_stats = DataProcessor.extract_tags_statistics(movies_df)
+        update_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = [(tag, int(count), update_time) for tag, count in zip(tag_stats['tag'], tag_stats['count'])]
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO tags_stats (tag, count, update_time) VALUES (?, ?, ?)
+                ON CONFLICT(tag) DO UPDATE SET count = excluded.count, update_time = excluded.update_time
+                WHERE tags_stats.count IS NOT excluded.count
+            ''', rows)
+            placeholders = ', '.join('?' for _ in rows)
+            self.conn.execute(f"DELETE FROM tags_stats WHERE tag NOT IN ({placeholders})", [r[0] for r in rows])
+
+    def save_movie_details(self, details):
+        """
+        按URL UPSERT 详情页解析结果（DoubanSpider.parse_detail 返回的字典列表）
+        返回：写入的行数
+        """
+        columns = self.DETAIL_COLUMNS
+        rows = [tuple(detail.get(c) for c in columns) for detail in details]
+        updates = ', '.join(f'{c} = excluded.{c}' for c in columns if c != 'url')
+        with self.conn:
+            self.conn.executemany(f"INSERT INTO movie_details ({', '.join(columns)}) "
+                                  f"VALUES ({', '.join('?' for _ in columns)}) "
+                                  f"ON CONFLICT(url) DO UPDATE SET {updates}", rows)
+        print(f"💾 详情数据已保存到数据库: {len(rows)} 部电影")
+        return len(rows)
+
+    def get_movie_details(self, columns=None):
+        """
+        读取详情页数据，并按 url 附上榜单中的排名
+        参数：columns 只读取这些详情列（默认全部）
+        """
+        select = ', '.join(f'd.{c}' for c in (columns or self.DETAIL_COLUMNS))
+        return pd.read_sql_query(f"SELECT m.rank, {select} FROM movie_details d "
+                                 f"LEFT JOIN movies m ON m.url = d.url ORDER BY m.rank", self.conn)
+
+    def _movie_columns(self):
+        """返回movies表当前的列名列表"""
+        return [row[1] for row in self.conn.execute("PRAGMA table_info(movies)")]
+
+    def diff_movies(self, movies_df, key=None):
+        """
+        与库中已有数据比对，找出新增或变化的电影
+        参数：movies_df 本次爬取并清洗后的完整数据；key 比对键（默认 Config.INCREMENTAL_KEY）
+        返回：只包含新增/变化行的DataFrame
+        """
+        key = key or Config.INCREMENTAL_KEY
+        fields = [f for f in Config.INCREMENTAL_FIELDS if f != key and f in movies_df.columns]
+        columns = [c for c in [key] + fields if c in self._movie_columns()]
+        if key not in columns:
+            return movies_df  # 表里还没有数据（或没有比对键），全部视为新增
+
+        select = ', '.join(f'`{c}`' for c in columns)
+        existing = pd.read_sql_query(f"SELECT {select} FROM movies", self.conn)
+        if existing.empty:
+            return movies_df
+        existing = existing.drop_duplicates(subset=[key], keep='last')
+        current = DataProcessor.to_plain(movies_df, [key] + fields)
+        merged = current.merge(existing, on=key, how='left', suffixes=('', '_old'), indicator=True)
+
+        changed = (merged['_merge'] == 'left_only').to_numpy()
+        for col in fields:
+            if col not in existing.columns:
+                continue
+            new, old = merged[col], merged[f'{col}_old']
+            if col == 'votes':
+                # 评价人数允许小幅波动
+                old = pd.to_numeric(old, errors='coerce').fillna(0)
+                diff = (new - old).abs() > old * Config.VOTES_TOLERANCE
+            elif pd.api.types.is_numeric_dtype(new):
+                diff = new.astype(float) != old.astype(float)
+            else:
+                diff = new.fillna('').astype(str) != old.fillna('').astype(str)
+            changed |= diff.to_numpy()
+
+        return movies_df[changed]
+
+    def save_movies_incremental(self, changed_df):
+        """
+        增量保存：只写入新增/变化的行（按标题 UPSERT），
+        不再整表替换；已跌出榜单的旧记录保留不删
+        参数：diff_movies 返回的DataFrame
+        """
+        print("💾 正在增量保存数据到数据库...")
+        try:
+            with self.conn:
+                written = self._upsert_movies(changed_df)
+            print(f"  ✓ 增量保存完成：写入 {written} 条")
+        except Exception as e:
+            print(f"❌ 增量保存数据失败: {e}")
+
+    def save_movies_stream(self, batches):
+        """
+        流式保存：每收到一批电影（如 spider.iter_movies(batch=True) 的一页）就写入并提交，
+        内存中只保留当前这一批；全部写完后再按库中最大评价人数统一计算热度
+        参数：batches 可迭代的电影字典列表，或 DataProcessor.clean_data_chunked 产出的DataFrame块
+        返回：写入的总条数
+        """
+        print("💾 正在流式保存数据到数据库...")
+        total = 0
+        for batch in batches:
+            batch_df = batch if isinstance(batch, pd.DataFrame) else pd.DataFrame(batch)
+            if batch_df.empty:
+                continue
+            if 'rating_category' not in batch_df.columns:
+                batch_df['rating_category'] = pd.cut(batch_df['rating'], bins=DataProcessor.RATING_BINS,
+                                                     labels=DataProcessor.RATING_LABELS)
+            try:
+                with self.conn:
+                    self._upsert_movies(batch_df)
+                total += len(batch_df)
+            except Exception as e:
+                print(f"❌ 保存本批数据失败: {e}")
+        # 热度依赖全体数据的最大评价人数，只能在最后统一计算
+        self.conn.execute('''
+            UPDATE movies SET popularity = ROUND(votes * 100.0 / (SELECT MAX(votes) FROM movies), 2)
+            WHERE (SELECT MAX(votes) FROM movies) > 0
+        ''')
+        self.conn.commit()
+        print(f"  ✓ 流式保存完成，共写入 {total} 条电影记录")
+        return total
+
+    def record_snapshot(self, movies_df, crawl_time=None, mark_missing=True):
+        """
+        记录本次爬取的历史快照
+        新建一条爬取批次，与每部电影最近一次快照比较，只有排名/评价人数/评分变化的电影才写入新行；
+        同一爬取时间只记录一次，用同一次爬取的数据重复写库时直接返回已有的批次
+        参数：movies_df 本次爬取的电影数据；crawl_time 这次爬取的时间（默认当前时间）；
+              mark_missing 是否为本次不在榜的电影写入一条 rank 为NULL的快照
+        返回：本次爬取批次的编号 crawl_id
+        """
+        crawl_time = crawl_time or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        recorded = self.conn.execute("SELECT id FROM crawls WHERE crawl_time = ?", (crawl_time,)).fetchone()
+        if recorded is not None:
+            print(f"  ⏭️ {crawl_time} 的爬取快照已是第 {recorded[0]} 次记录，不再重复写入")
+            return recorded[0]
+        stage = pd.DataFrame({
+            'title': movies_df['title'],
+            'rank': pd.to_numeric(movies_df['rank'], errors='coerce').round(),
+            'votes': pd.to_numeric(movies_df['votes'], errors='coerce').round(),
+            'rating_x10': (pd.to_numeric(movies_df['rating'], errors='coerce') * 10).round(),
+        }).drop_duplicates(subset=['title'], keep='last').astype(object)
+        stage = stage.where(stage.notna(), None)
+        rows = [(t, None if r is None else int(r), None if v is None else int(v), None if x is None else int(x))
+                for t, r, v, x in stage.itertuples(index=False, name=None)]
+
+        # 与该电影最近一条快照完全相同则跳过（PRIMARY KEY 有序，取最近一条只需一次索引查找）
+        unchanged = '''
+            EXISTS (SELECT 1 FROM (SELECT rank, votes, rating_x10 FROM movie_snapshots
+                                   WHERE movie_id = k.id ORDER BY crawl_id DESC LIMIT 1) p
+                    WHERE p.rank IS {rank} AND p.votes IS {votes} AND p.rating_x10 IS {rating})
+        '''
+        with self.conn:
+            crawl_id = self.conn.execute("INSERT INTO crawls (crawl_time, movie_count) VALUES (?, ?)",
+                                         (crawl_time, len(rows))).lastrowid
+            self.conn.executemany("INSERT OR IGNORE INTO movie_keys (title) VALUES (?)", ((r[0],) for r in rows))
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS snapshot_stage "
+                              "(title TEXT PRIMARY KEY, rank INTEGER, votes INTEGER, rating_x10 INTEGER)")
+            self.conn.execute("DELETE FROM temp.snapshot_stage")
+            self.conn.executemany("INSERT INTO temp.snapshot_stage VALUES (?, ?, ?, ?)", rows)
+            written = self.conn.execute(f'''
+                INSERT INTO movie_snapshots (movie_id, crawl_id, rank, votes, rating_x10)
+                SELECT k.id, ?, s.rank, s.votes, s.rating_x10
+                FROM temp.snapshot_stage s JOIN movie_keys k ON k.title = s.title
+                WHERE NOT {unchanged.format(rank='s.rank', votes='s.votes', rating='s.rating_x10')}
+            ''', (crawl_id,)).rowcount
+            if mark_missing:
+                # 本次不在榜的电影：最近一条快照还在榜时，写入一条下榜记录
+                written += self.conn.execute(f'''
+                    INSERT INTO movie_snapshots (movie_id, crawl_id, rank, votes, rating_x10)
+                    SELECT k.id, ?, NULL, NULL, NULL FROM movie_keys k
+                    WHERE k.title NOT IN (SELECT title FROM temp.snapshot_stage)
+                      AND NOT {unchanged.format(rank='NULL', votes='NULL', rating='NULL')}
+                ''', (crawl_id,)).rowcount
+        print(f"  ✓ 已记录第 {crawl_id} 次爬取快照（{len(rows)} 部电影，变化 {written} 条）")
+        return crawl_id
+
+    def get_crawls(self):
+        """返回所有爬取批次（id、爬取时间、电影数）"""
+        return pd.read_sql_query("SELECT id AS crawl_id, crawl_time, movie_count FROM crawls ORDER BY id", self.conn)
+
+    def get_movie_history(self, titles, fill=False):
+        """
+        查询一部或多部电影的排名/评价人数/评分时间序列
+        只按 movie_keys 的唯一索引和快照表主键读取这些电影的行，不加载全部历史
+        参数：titles 电影标题（字符串或列表）；fill=True 时把去重省略的批次补齐（沿用上一条快照的值）
+        返回：DataFrame，列为 title、crawl_id、crawl_time、rank、votes、rating
+        """
+        titles = [titles] if isinstance(titles, str) else list(titles)
+        placeholders = ', '.join('?' for _ in titles)
+        history = pd.read_sql_query(f'''
+            SELECT k.title, s.crawl_id, c.crawl_time, s.rank, s.votes, s.rating_x10 / 10.0 AS rating
+            FROM movie_keys k
+            JOIN movie_snapshots s ON s.movie_id = k.id
+            JOIN crawls c ON c.id = s.crawl_id
+            WHERE k.title IN ({placeholders})
+            ORDER BY k.title, s.crawl_id
+        ''', self.conn, params=titles)
+        if not fill or history.empty:
+            return history
+
+        crawls = self.get_crawls()
+        filled = []
+        for title, group in history.groupby('title', sort=False):
+            # 从该电影第一次出现的批次开始，每个批次一行
+            span = crawls[crawls['crawl_id'] >= group['crawl_id'].iloc[0]]
+            # 按批次号向前取最近一条快照（下榜快照本身就是NULL，会原样延续）
+            values = group.set_index('crawl_id')[['rank', 'votes', 'rating']].reindex(span['crawl_id'],
+                                                                                     method='ffill')
+            filled.append(values.reset_index().assign(title=title, crawl_time=span['crawl_time'].to_numpy()))
+        return pd.concat(filled, ignore_index=True)[history.columns]
+
+    def get_analysis_data(self, columns=None):
+        """
+        从数据库获取分析数据
+        参数：columns 只读取这些列（默认全部列）
+        """
+        select = ', '.join(f'`{c}`' for c in columns) if columns else '*'
+        return pd.read_sql_query(f"SELECT {select} FROM movies", self.conn)
+
+    def _median(self, column):
+        """用窗口函数在SQLite中计算某列的中位数"""
+        return self.conn.execute(f'''
+            WITH ordered AS (
+                SELECT `{column}` AS v, ROW_NUMBER() OVER (ORDER BY `{column}`) AS rn, COUNT(*) OVER () AS n
+                FROM movies WHERE `{column}` IS NOT NULL
+            )
+            SELECT AVG(v) FROM ordered WHERE rn IN ((n + 1) / 2, (n + 2) / 2)
+        ''').fetchone()[0]
+
+    def report_aggregates(self, top_directors=5, top_tags=10):
+        """
+        在SQLite中计算分析报告需要的聚合统计，只返回聚合结果，不把整张表读入pandas
+        返回：与 AnalysisReporter.compute_aggregates 结构相同的字典
+        """
+        count, rating_mean, rating_max, rating_min, votes_sum, votes_mean = self.conn.execute('''
+            SELECT COUNT(*), AVG(rating), MAX(rating), MIN(rating), SUM(votes), AVG(votes) FROM movies
+        ''').fetchone()
+
+        # 评分分布：按标签顺序输出，没有电影的等级记为0（与 pandas 分类计数一致）
+        category_counts = dict(self.conn.execute(
+            "SELECT rating_category, COUNT(*) FROM movies GROUP BY rating_category"
+        ).fetchall())
+        rating_dist = [(label, category_counts.get(label, 0)) for label in DataProcessor.RATING_LABELS]
+
+        decades = self.conn.execute('''
+            SELECT year / 10 * 10 AS decade, COUNT(*) FROM movies
+            WHERE year IS NOT NULL GROUP BY decade ORDER BY decade
+        ''').fetchall()
+        directors = self.conn.execute('''
+            SELECT director, COUNT(*) AS n FROM movies WHERE director IS NOT NULL
+            GROUP BY director ORDER BY n DESC, MIN(rank), director LIMIT ?  -- 并列时按最好的排名、再按姓名
+        ''', (top_directors,)).fetchall()
+        # 标签在写库时已汇总到 tags_stats 表
+        tags = self.conn.execute("SELECT tag, count FROM tags_stats ORDER BY count DESC, tag LIMIT ?",
+                                 (top_tags,)).fetchall()
+
+        return {
+            'count': count,
+            'rating_mean': rating_mean, 'rating_median': self._median('rating'),
+            'rating_max': rating_max, 'rating_min': rating_min,
+            'votes_sum': votes_sum or 0, 'votes_mean': votes_mean, 'votes_median': self._median('votes'),
+            'rating_dist': rating_dist, 'decades': decades, 'directors': directors, 'tags': tags,
+        }
+
+    def close(self):
+        """关闭数据库连接（关闭前让SQLite按需更新查询优化器的统计信息）"""
+        try:
+            self.conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        self.conn.close()
+
+
+class ColumnarStore:
+    """
+    列式存储类：每次爬取写成 Parquet 数据集的一个分区（crawl_id=N/）
+    读取时只解码需要的列，并按分区和行组统计信息跳过不满足条件的数据
+    """
+
+    # 重复值多的文本列使用字典编码
+    DICTIONARY_COLUMNS = ['director', 'country', 'tags', 'rating_category']
+
+    def __init__(self, root=Config.PARQUET_DIR):
+        """参数：root 数据集根目录"""
+        _load_pyarrow()
+        self.root = root
+
+    def _to_table(self, movies_df, crawl_id):
+        """把电影DataFrame转换成带 crawl_id 列、文本列字典编码的 Arrow 表"""
+        table = pa.Table.from_pandas(movies_df, preserve_index=False)
+        for name in self.DICTIONARY_COLUMNS:
+            if name in table.column_names and not pa.types.is_dictionary(table.schema.field(name).type):
+                index = table.schema.get_field_index(name)
+                table = table.set_column(index, name, pc.dictionary_encode(table.column(name)))
+        return table.append_column('crawl_id', pa.array([crawl_id] * len(table), pa.int32()))
+
+    def write(self, movies_df, crawl_id):
+        """
+        把一次爬取的数据写成 crawl_id=N 分区（同一批次重复写入时覆盖该分区）
+        参数：movies_df 清洗后的电影数据；crawl_id 爬取批次编号（DatabaseManager.record_snapshot 的返回值）
+        """
+        table = self._to_table(movies_df, crawl_id)
+        pq.write_to_dataset(table, self.root, partition_cols=['crawl_id'],
+                            existing_data_behavior='delete_matching',
+                            basename_template=f'part-{crawl_id}-{{i}}.parquet',
+                            use_dictionary=self.DICTIONARY_COLUMNS, compression='zstd')
+        print(f"  ✓ 已写入 Parquet 分区 {self.root}/crawl_id={crawl_id}（{len(table)} 行）")
+
+    def dataset(self):
+        """返回按 hive 分区发现的 Arrow 数据集（不读取数据）"""
+        return pads.dataset(self.root, format='parquet', partitioning='hive')
+
+    def read(self, columns=None, filters=None, as_pandas=True):
+        """
+        读取数据集
+        参数：columns 只读取这些列；filters 过滤条件，pyarrow 表达式或
+              [('year', '>=', 2000), ('crawl_id', '=', 3)] 形式的列表（按分区和行组统计下推）；
+              as_pandas=False 时直接返回 Arrow 表，可零拷贝交给其它工具
+        """
+        if isinstance(filters, list):
+            filters = pq.filters_to_expression(filters)
+        table = self.dataset().to_table(columns=columns, filter=filters)
+        return table.to_pandas() if as_pandas else table
+# =================================================
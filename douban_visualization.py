@@ -0,0 +1,532 @@
+"""
+豆瓣电影Top250数据分析系统 - 可视化子系统
+图表渲染（显式 Figure/Axes）、并行渲染、渲染缓存、词云
+matplotlib 和 wordcloud 导入较慢，只有需要生成图表时才加载这个模块
+"""
+
+# ========== MATPLOTLIB 配置 - 必须放在导入其他matplotlib模块之前！ ==========
+# 注意：matplotlib的配置需要在导入其他matplotlib模块之前完成
+import matplotlib
+
+# 方案1: 使用 'Agg' 后端（最稳定，直接生成图片文件，不弹窗）
+# Agg后端用于非交互式环境，将图形渲染为图像文件
+matplotlib.use('Agg')
+
+# 方案2: 如果想尝试弹窗显示，但在PyCharm中可能有问题
+# matplotlib.use('TkAgg')
+
+# 中文字体、负号等设置见 DataVisualizer.RC，只在每张图的 rc_context 中生效，导入本模块不修改全局 rcParams
+# ================================================================
+
+import matplotlib.style  # 样式上下文（只在绘图期间生效）
+from matplotlib.figure import Figure  # 显式创建图形，不经过 pyplot 和它的全局图形列表
+from wordcloud import WordCloud, STOPWORDS  # 词云生成库
+import pandas as pd  # 数据处理库
+import numpy as np  # 科学计算库
+from datetime import datetime  # 日期时间处理
+import time  # 渲染计时
+import os  # 文件路径
+import sys  # 刷新子进程的输出
+import json  # 渲染缓存清单
+from collections import OrderedDict  # 词云布局的LRU缓存
+import hashlib  # 词云频率表、图表输入数据的指纹
+import functools  # 图表缓存装饰器
+import inspect  # 读取图表方法的默认保存路径
+import shutil  # 查找 fc-list 命令
+import subprocess  # 调用 fontconfig 查找中文字体
+from contextlib import contextmanager  # 图形的创建、保存与释放
+from concurrent.futures import ProcessPoolExecutor  # 图表渲染进程池
+from douban_config import Config  # 项目配置
+from douban_processing import TagAnalytics  # 词云使用的标签计数
+
+# ==================== 可视化模块 ====================
+class WordCloudRenderer:
+    """
+    词云子系统：直接用标签计数生成词云（不再拼接字符串重新分词），
+    中文字体只查找一次（并行渲染时由主进程查找后传给子进程），
+    布局按频率表指纹缓存在 Config.WORDCLOUD_LAYOUTS 文件中，进程池里的每个渲染进程都能复用；
+    图片本身是否需要重新渲染由 ChartCache 在主进程中判断
+    """
+
+    # 常见系统上的中文字体路径，按顺序尝试
+    FONT_CANDIDATES = [
+        'C:/Windows/Fonts/simhei.ttf',  # Windows 黑体
+        'C:/Windows/Fonts/msyh.ttc',  # Windows 微软雅黑
+        '/System/Library/Fonts/PingFang.ttc',  # macOS
+        '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',  # Debian/Ubuntu fonts-noto-cjk
+        '/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc',  # Fedora/CentOS
+        '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',  # 文泉驿微米黑
+        '/usr/share/fonts/wenquanyi/wqy-microhei/wqy-microhei.ttc',
+    ]
+    STOPWORDS = set(STOPWORDS) | {'电影', '影片', '导演'}  # 停用词（添加自定义中文停用词）
+    OPTIONS = dict(
+        width=800, height=400,
+        background_color='white',
+        max_words=100,  # 最多显示100个词
+        contour_width=1,  # 轮廓宽度
+        contour_color='steelblue',  # 轮廓颜色
+        colormap='viridis'  # 颜色映射
+    )
+    LAYOUT_CACHE_SIZE = 8  # 内存中和布局文件中各保留的布局数量
+
+    _font = None  # 已查找到的字体（None 表示还没查找）
+    _layouts = OrderedDict()  # 频率表指纹 -> 已完成布局的 WordCloud 对象（进程内）
+
+    @classmethod
+    def resolve_font(cls):
+        """
+        查找中文字体文件，结果缓存，整个进程只查找一次
+        顺序：Config.WORDCLOUD_FONT → 常见路径 → fontconfig（fc-list :lang=zh）
+        返回：字体文件路径；找不到时返回 None（使用 wordcloud 自带字体，中文会显示为方框）
+        """
+        if cls._font is None:
+            cls._font = cls._find_font() or ''
+            if not cls._font:
+                print("⚠️  未找到中文字体，词云中的中文可能无法显示（可设置 Config.WORDCLOUD_FONT）")
+        return cls._font or None
+
+    @classmethod
+    def _find_font(cls):
+        """按顺序查找第一个存在的中文字体文件"""
+        for path in [Config.WORDCLOUD_FONT] + cls.FONT_CANDIDATES:
+            if path and os.path.exists(path):
+                return path
+        fc_list = shutil.which('fc-list')
+        if fc_list:
+            try:
+                output = subprocess.run([fc_list, ':lang=zh', 'file'], capture_output=True, text=True,
+                                        timeout=10).stdout
+            except (OSError, subprocess.SubprocessError):
+                return None
+            for line in output.splitlines():
+                path = line.split(':')[0].strip()
+                if path and os.path.exists(path):
+                    return path
+        return None
+
+    @classmethod
+    def frequencies(cls, movies_df):
+        """取预先计算好的标签计数（TagAnalytics），去掉停用词，返回 {标签: 次数}"""
+        counts = TagAnalytics.counts(movies_df)
+        return {tag: int(count) for tag, count in counts.items() if tag not in cls.STOPWORDS}
+
+    @classmethod
+    def fingerprint(cls, frequencies):
+        """频率表 + 字体 + 词云参数的指纹，任何一项变化都会得到不同的值"""
+        payload = json.dumps([sorted(frequencies.items()), cls.resolve_font(), cls.OPTIONS],
+                             ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def layout(cls, frequencies, key=None, layouts_path=None):
+        """
+        返回完成布局的 WordCloud 对象；同一指纹只布局一次
+        先查进程内的LRU，再查布局文件（其他渲染进程或上一次运行保存的），都没有时才计算布局并写入文件
+        参数：layouts_path 布局文件（默认 Config.WORDCLOUD_LAYOUTS）
+        """
+        key = key or cls.fingerprint(frequencies)
+        if key in cls._layouts:
+            cls._layouts.move_to_end(key)
+            return cls._layouts[key]
+        layouts_path = layouts_path or Config.WORDCLOUD_LAYOUTS
+        wordcloud = WordCloud(font_path=cls.resolve_font(), **cls.OPTIONS)
+        stored = cls._load_layouts(layouts_path).get(key)
+        if stored is not None:
+            # 按保存的词、字号、位置、方向和颜色直接绘制，跳过耗时的布局计算
+            wordcloud.layout_ = [(tuple(word_freq), font_size, tuple(position), orientation, color)
+                                 for word_freq, font_size, position, orientation, color in stored]
+        else:
+            wordcloud.generate_from_frequencies(frequencies)
+            cls._save_layout(layouts_path, key, wordcloud)
+        cls._layouts[key] = wordcloud
+        while len(cls._layouts) > cls.LAYOUT_CACHE_SIZE:
+            cls._layouts.popitem(last=False)
+        return wordcloud
+
+    @staticmethod
+    def _load_layouts(layouts_path):
+        """读取布局文件：{指纹: 布局列表}，文件不存在或损坏时返回空字典"""
+        try:
+            with open(layouts_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @classmethod
+    def _save_layout(cls, layouts_path, key, wordcloud):
+        """把一个布局写入布局文件，只保留最近写入的 LAYOUT_CACHE_SIZE 个（先写临时文件再替换）"""
+        layouts = cls._load_layouts(layouts_path)
+        layouts.pop(key, None)
+        layouts[key] = [[list(word_freq), int(font_size), [int(v) for v in position],
+                         None if orientation is None else int(orientation), color]
+                        for word_freq, font_size, position, orientation, color in wordcloud.layout_]
+        for old_key in list(layouts)[:-cls.LAYOUT_CACHE_SIZE]:
+            del layouts[old_key]
+        temp_path = f'{layouts_path}.{os.getpid()}.tmp'  # 多个渲染进程可能同时写入
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(layouts, f, ensure_ascii=False)
+        os.replace(temp_path, layouts_path)
+
+
+class ChartCache:
+    """
+    图表渲染缓存：在清单文件中记录每张图片由哪份输入数据和样式渲染而来
+    指纹相同且图片没有被删除或替换时，跳过这张图的渲染
+    """
+
+    VERSION = 1  # 绘图代码有改动时加1，使清单中的旧记录全部失效
+
+    def __init__(self, manifest_path=Config.CHART_MANIFEST):
+        self.manifest_path = manifest_path
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @classmethod
+    def fingerprint(cls, chart_df, styling):
+        """图表用到的列的内容 + 样式参数的指纹"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([cls.VERSION, list(chart_df.columns), styling],
+                                 ensure_ascii=False, sort_keys=True, default=str).encode('utf-8'))
+        if len(chart_df.columns):
+            digest.update(pd.util.hash_pandas_object(chart_df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def is_fresh(self, save_path, fingerprint):
+        """清单中 save_path 的指纹一致，且图片文件还是当时写入的那个"""
+        entry = self.entries.get(os.path.abspath(save_path))
+        if not entry or entry['fingerprint'] != fingerprint or not os.path.exists(save_path):
+            return False
+        stat = os.stat(save_path)
+        return entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime
+
+    def record(self, save_path, fingerprint, chart):
+        """记录一张图片的指纹，并立即写回清单（先写临时文件再替换，避免写到一半的清单）"""
+        stat = os.stat(save_path)
+        self.entries[os.path.abspath(save_path)] = {
+            'chart': chart, 'fingerprint': fingerprint, 'size': stat.st_size, 'mtime': stat.st_mtime,
+            'rendered_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        temp_path = f'{self.manifest_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+
+def _cached_chart(method):
+    """
+    图表方法的装饰器：输入数据和样式的指纹与清单一致、图片仍在时跳过渲染，
+    渲染成功（方法返回保存路径）后把指纹写入清单
+    """
+    default_path = inspect.signature(method).parameters['save_path'].default
+
+    @functools.wraps(method)
+    def wrapper(self, save_path=default_path):
+        if self.cache is None:
+            return method(self, save_path)
+        fingerprint = self.chart_fingerprint(method.__name__)
+        if self.cache.is_fresh(save_path, fingerprint):
+            print(f"  ✓ 输入数据未变化，跳过 {save_path}")
+            return save_path
+        result = method(self, save_path)
+        if result:
+            self.cache.record(result, fingerprint, method.__name__)
+        return result
+    return wrapper
+
+
+class DataVisualizer:
+    """数据可视化类，负责生成各种图表"""
+
+    # 每个图表方法用到的列：并行渲染时只把这些列发送给子进程
+    CHART_COLUMNS = {
+        'plot_rating_distribution': ['rating', 'rating_category'],
+        'plot_scatter_rating_votes': ['title', 'rating', 'votes', 'year', 'popularity'],
+        'plot_yearly_trend': ['year', 'rating'],
+        'create_wordcloud': ['tags'],
+        'create_dashboard': ['title', 'rating', 'country', 'votes'],
+    }
+
+    STYLE = 'seaborn-v0_8-darkgrid'  # 图表样式（只在绘图期间生效，不修改全局 rcParams）
+    RC = {'font.sans-serif': ['Microsoft YaHei', 'SimHei', 'KaiTi'],  # 中文字体
+          'axes.unicode_minus': False}  # 解决负号显示问题
+
+    DPI = 150  # 图片分辨率
+
+    def __init__(self, movies_df, use_cache=None):
+        """
+        初始化，设置图表颜色
+        参数：use_cache 是否使用图表渲染缓存（默认 Config.CHART_CACHE）
+        """
+        self.df = movies_df  # 电影数据DataFrame
+        # 明确指定为Python列表，避免类型推断问题
+        self.colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']  # 配色方案
+        use_cache = Config.CHART_CACHE if use_cache is None else use_cache
+        self.cache = ChartCache() if use_cache else None
+
+    @contextmanager
+    def _figure(self, save_path, **figure_kwargs):
+        """
+        创建一个不注册到 pyplot 的 Figure，with 块结束时保存并立即释放
+        图表不会留在 pyplot 的全局图形列表中，长时间运行的进程反复绘图时内存保持平稳
+        """
+        with matplotlib.style.context(self.STYLE), matplotlib.rc_context(self.RC):
+            fig = Figure(**figure_kwargs)
+            try:
+                yield fig
+                fig.tight_layout()  # 自动调整子图参数
+                fig.savefig(save_path, dpi=self.DPI, bbox_inches='tight')  # 保存图形
+            finally:
+                fig.clear()  # 断开图形与各个子图、图元之间的引用，尽快回收内存
+
+    @_cached_chart
+    def plot_rating_distribution(self, save_path='rating_distribution.png'):
+        """
+        绘制评分分布直方图
+        参数：保存路径
+        """
+        with self._figure(save_path, figsize=(12, 6)) as fig:  # 创建图形，设置尺寸
+            ax_hist, ax_bar = fig.subplots(1, 2)  # 1行2列的两个子图
+
+            # 绘制直方图
+            n, bins, patches = ax_hist.hist(self.df['rating'], bins=20, edgecolor='black', alpha=0.7,
+                                            color=self.colors[0])
+            ax_hist.set_title('豆瓣Top250评分分布直方图', fontsize=14, fontweight='bold')
+            ax_hist.set_xlabel('评分', fontsize=12)
+            ax_hist.set_ylabel('电影数量', fontsize=12)
+            ax_hist.grid(True, alpha=0.3)  # 显示网格
+
+            # 添加数据标签（在柱子顶部显示数量）
+            for i in range(len(n)):
+                if n[i] > 0:
+                    ax_hist.text(float(bins[i]) + (float(bins[i+1]) - float(bins[i]))/2, float(n[i]) + 0.5,
+                                 str(int(n[i])), ha='center', va='bottom', fontsize=9)
+
+            rating_counts = self.df['rating_category'].value_counts().sort_index()
+            bars = ax_bar.bar(rating_counts.index, rating_counts.values, color=self.colors[1:])
+            ax_bar.set_xlabel('评分等级', fontsize=12)
+            ax_bar.set_ylabel('电影数量', fontsize=12)
+            ax_bar.set_title('评分等级分布', fontsize=14, fontweight='bold')
+            ax_bar.tick_params(axis='x', labelrotation=45)  # x轴标签旋转45度
+
+            # 在柱子上添加数值
+            for bar in bars:
+                height = bar.get_height()
+                ax_bar.text(bar.get_x() + bar.get_width() / 2., height + 0.5,
+                            f'{int(height)}', ha='center', va='bottom', fontsize=10)
+        print(f"  ✓ 评分分布图已保存为 {save_path}")
+        return save_path
+
+    @_cached_chart
+    def plot_scatter_rating_votes(self, save_path='rating_votes_scatter.png'):
+        """
+        绘制评分与评价人数散点图（气泡图）
+        气泡大小表示热度，颜色表示年份
+        """
+        with self._figure(save_path, figsize=(10, 6)) as fig:
+            ax = fig.subplots()
+
+            # 绘制散点图，颜色表示年份，大小表示热度
+            scatter = ax.scatter(self.df['rating'], self.df['votes'],
+                                 c=self.df['year'], cmap='viridis',
+                                 s=self.df['popularity'], alpha=0.6, edgecolors='w', linewidth=0.5)
+
+            fig.colorbar(scatter, ax=ax, label='上映年份')  # 添加颜色条
+            ax.set_xlabel('评分', fontsize=12)
+            ax.set_ylabel('评价人数', fontsize=12)
+            ax.set_title('评分 vs 评价人数 (气泡大小=热度)', fontsize=14, fontweight='bold')
+            ax.grid(True, alpha=0.3)
+
+            # 添加关键点标注（评分最高的几部）
+            top_movies = self.df.nlargest(5, 'rating')  # 取评分最高的5部电影
+            for _, movie in top_movies.iterrows():
+                ax.annotate(movie['title'][:10] + '...',  # 只显示前10个字符
+                            xy=(movie['rating'], movie['votes']),  # 标注点坐标
+                            xytext=(5, 5), textcoords='offset points',  # 文本偏移
+                            fontsize=9, arrowprops=dict(arrowstyle='->', alpha=0.5))
+        print(f"  ✓ 散点图已保存为 {save_path}")
+        return save_path
+
+    @_cached_chart
+    def plot_yearly_trend(self, save_path='yearly_trend.png'):
+        """绘制年度趋势分析图"""
+        with self._figure(save_path, figsize=(12, 5)) as fig:
+            ax_count, ax_rating = fig.subplots(1, 2)
+
+            # 按年份统计电影数量（第一个子图：年份分布折线图）
+            yearly_counts = self.df.groupby('year').size()
+            ax_count.plot(yearly_counts.index, yearly_counts.values,
+                          marker='o', linewidth=2, markersize=6, color=self.colors[2])
+            ax_count.fill_between(yearly_counts.index, yearly_counts.values, alpha=0.3,
+                                  color=self.colors[2])  # 填充区域
+            ax_count.set_xlabel('年份', fontsize=12)
+            ax_count.set_ylabel('电影数量', fontsize=12)
+            ax_count.set_title('Top250电影年份分布', fontsize=14, fontweight='bold')
+            ax_count.grid(True, alpha=0.3)
+
+            # 按年份平均评分（第二个子图：各年份平均评分柱状图）
+            yearly_rating = self.df.groupby('year')['rating'].mean()
+            ax_rating.bar(yearly_rating.index, yearly_rating.values, color=self.colors[3], alpha=0.7)
+            ax_rating.set_xlabel('年份', fontsize=12)
+            ax_rating.set_ylabel('平均评分', fontsize=12)
+            ax_rating.set_title('各年份电影平均评分', fontsize=14, fontweight='bold')
+            ax_rating.tick_params(axis='x', labelrotation=45)
+            ax_rating.grid(True, alpha=0.3)
+        print(f"  ✓ 年度趋势图已保存为 {save_path}")
+        return save_path
+
+    @_cached_chart
+    def create_wordcloud(self, save_path='wordcloud.png'):
+        """生成标签词云图（布局按标签分布缓存，分布不变时只重新绘制）"""
+        frequencies = WordCloudRenderer.frequencies(self.df)  # 直接使用标签计数
+        if not frequencies:
+            print("⚠️  没有标签数据可用于生成词云")
+            return
+
+        wordcloud = WordCloudRenderer.layout(frequencies)
+
+        with self._figure(save_path, figsize=(12, 6)) as fig:
+            ax = fig.subplots()
+            ax.imshow(wordcloud, interpolation='bilinear')  # 显示词云
+            ax.axis('off')  # 关闭坐标轴
+            ax.set_title('豆瓣Top250电影标签词云', fontsize=16, fontweight='bold', pad=20)
+        print(f"  ✓ 词云图已保存为 {save_path}")
+        return save_path
+
+    @_cached_chart
+    def create_dashboard(self, save_path='analysis_dashboard.png'):
+        """创建综合仪表板（包含多个子图）"""
+        print("📊 生成数据分析仪表板...")
+
+        # 创建2x2的仪表板
+        with self._figure(save_path, figsize=(15, 12)) as fig:
+            axes = fig.subplots(2, 2)
+            fig.suptitle('豆瓣电影Top250数据分析仪表板', fontsize=18, fontweight='bold', y=0.98)
+
+            # 1. 评分分布箱线图
+            axes[0, 0].boxplot(self.df['rating'], vert=False, patch_artist=True,
+                               boxprops=dict(facecolor=self.colors[0], alpha=0.7))
+            axes[0, 0].set_xlabel('评分')
+            axes[0, 0].set_title('评分分布箱线图', fontweight='bold')
+            axes[0, 0].grid(True, alpha=0.3)
+
+            # 2. 评分前十电影水平柱状图
+            top10 = self.df.nlargest(10, 'rating')[['title', 'rating']]
+            y_pos = range(len(top10))
+            axes[0, 1].barh(y_pos, top10['rating'], color=self.colors[1])
+            axes[0, 1].set_yticks(y_pos)
+            # 标题太长时截断显示
+            axes[0, 1].set_yticklabels([t[:15] + '...' if len(t) > 15 else t for t in top10['title']])
+            axes[0, 1].set_xlabel('评分')
+            axes[0, 1].set_title('评分Top10电影', fontweight='bold')
+            axes[0, 1].invert_yaxis()  # 反转y轴，使最高评分在最上面
+
+            # 3. 国家分布饼图（前10）
+            country_counts = self.df['country'].str.split('/').explode().str.strip().value_counts().head(10)
+            axes[1, 0].pie(country_counts.values, labels=country_counts.index,
+                           autopct='%1.1f%%', colors=self.colors, startangle=90)
+            axes[1, 0].set_title('电影国家/地区分布(Top10)', fontweight='bold')
+
+            # 4. 评价人数分布直方图（对数尺度）
+            axes[1, 1].hist(np.log10(self.df['votes'] + 1), bins=15,
+                            edgecolor='black', alpha=0.7, color=self.colors[3])
+            axes[1, 1].set_xlabel('评价人数(对数尺度)')
+            axes[1, 1].set_ylabel('电影数量')
+            axes[1, 1].set_title('评价人数分布(对数转换)', fontweight='bold')
+            axes[1, 1].grid(True, alpha=0.3)
+        print(f"  ✓ 综合仪表板已保存为 {save_path}")
+        return save_path
+
+    def render_all(self, charts=None, parallel=None, workers=None):
+        """
+        生成全部图表
+        并行模式下每个图表是进程池中的一个独立任务，只接收自己用到的列，总耗时约等于最慢的那张图
+        参数：charts 要生成的图表方法名列表（默认 CHART_COLUMNS 中的全部）；
+              parallel 是否并行（默认 Config.PARALLEL_CHARTS）；workers 进程数（默认 Config.CHART_WORKERS）
+        返回：{图表方法名: 渲染耗时（秒）}，失败的图表不在其中
+        """
+        charts = list(charts or self.CHART_COLUMNS)
+        parallel = Config.PARALLEL_CHARTS if parallel is None else parallel
+        workers = min(len(charts), workers or Config.CHART_WORKERS or os.cpu_count() or 1)
+        start = time.perf_counter()
+        timings = {}
+
+        if parallel and workers > 1:
+            # 在主进程中检查缓存，只把需要重新渲染的图表交给子进程，清单也只由主进程写入
+            stale = {}
+            for name in charts:
+                fingerprint = self.chart_fingerprint(name) if self.cache else None
+                if fingerprint and self.cache.is_fresh(self.chart_path(name), fingerprint):
+                    print(f"  ✓ 输入数据未变化，跳过 {self.chart_path(name)}")
+                    timings[name] = 0.0
+                else:
+                    stale[name] = fingerprint
+            if stale:
+                workers = min(len(stale), workers)
+                print(f"🎨 正在并行生成 {len(stale)} 张图表（{workers} 个进程）...")
+                font = (WordCloudRenderer.resolve_font() or '') if 'create_wordcloud' in stale else None
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = {name: pool.submit(_render_chart_job, name, self._chart_data(name), font=font)
+                               for name in stale}
+                    for name, future in futures.items():
+                        try:
+                            timings[name], result = future.result()
+                        except Exception as e:
+                            print(f"❌ 图表 {name} 生成失败: {e}")
+                            continue
+                        if result and stale[name]:
+                            self.cache.record(result, stale[name], name)
+        else:
+            for name in charts:
+                try:
+                    timings[name], _ = _render_chart_job(name, self.df, visualizer=self)
+                except Exception as e:
+                    print(f"❌ 图表 {name} 生成失败: {e}")
+
+        if timings:
+            slowest = max(timings, key=timings.get)
+            print(f"  ✓ 图表生成完成，总耗时 {time.perf_counter() - start:.2f} 秒"
+                  f"（最慢的 {slowest}: {timings[slowest]:.2f} 秒）")
+        return timings
+
+    def _chart_data(self, name):
+        """取出某个图表用到的列（数据中没有的列跳过）"""
+        return self.df[[c for c in self.CHART_COLUMNS[name] if c in self.df.columns]]
+
+    @staticmethod
+    def chart_path(name):
+        """图表方法的默认保存路径"""
+        return inspect.signature(getattr(DataVisualizer, name)).parameters['save_path'].default
+
+    def chart_styling(self, name):
+        """影响某个图表外观的样式参数（参与缓存指纹）"""
+        styling = {'style': self.STYLE, 'rc': self.RC, 'colors': self.colors, 'dpi': self.DPI}
+        if name == 'create_wordcloud':
+            styling.update(options=WordCloudRenderer.OPTIONS, font=WordCloudRenderer.resolve_font(),
+                           stopwords=sorted(WordCloudRenderer.STOPWORDS))
+        return styling
+
+    def chart_fingerprint(self, name):
+        """某个图表的输入数据（只含它用到的列）和样式的指纹"""
+        return ChartCache.fingerprint(self._chart_data(name), self.chart_styling(name))
+
+
+def _render_chart_job(name, chart_df, visualizer=None, font=None):
+    """
+    渲染单张图表的任务（进程池中执行，必须是模块级函数才能被pickle）
+    子进程中不读写缓存清单（由主进程负责）
+    参数：font 主进程已查找到的词云字体（'' 表示没有找到），子进程不必再查找
+    返回：(渲染耗时（秒）, 图片路径；没有生成图片时为 None)
+    """
+    start = time.perf_counter()
+    if font is not None:
+        WordCloudRenderer._font = font
+    visualizer = visualizer or DataVisualizer(chart_df, use_cache=False)
+    try:
+        result = getattr(visualizer, name)()
+    finally:
+        sys.stdout.flush()  # 进程池的工作进程退出时不会刷新输出缓冲，提示信息会丢失
+    return time.perf_counter() - start, result
+# =================================================
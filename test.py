@@ -1,22 +1,30 @@
 import requests
-from bs4 import BeautifulSoup
-import time
+from bs4 import BeautifulSoup, SoupStrainer
+from douban_net import (get_scheduler, get_cache, get_breaker, get_session, fetch_text, RetryPolicy,
+                        CacheMiss, CircuitOpenError)
+
+retry_policy = RetryPolicy() # 指数退避+抖动重试，遵守 Retry-After
+dead_letters = [] # 重试后仍失败的页面URL，在最后重新排队
 
 def page_request(url, ua):
-    """请求页面"""
+    """请求页面（优先读磁盘缓存，未命中时由共享调度器按主机限速，失败自动重试）"""
     try:
-        response = requests.get(url, headers=ua, timeout=10)
-        response.raise_for_status() # 检查请求是否成功
-        # 豆瓣页面编码通常是utf-8，这里指定一下避免乱码
-        response.encoding = 'utf-8'
-        return response.text
-    except requests.exceptions.RequestException as e:
+        # 豆瓣页面编码通常是utf-8，fetch_text 内部已经指定，避免乱码
+        # 共享会话复用长连接，不再每个详情页都重新建立 TCP+TLS 连接
+        return fetch_text(get_session().get, url, headers=ua, timeout=10,
+                          cache=get_cache(), scheduler=get_scheduler(),
+                          retry=retry_policy, breaker=get_breaker())
+    except (requests.exceptions.RequestException, CacheMiss, CircuitOpenError) as e:
         print(f"请求页面失败: {e}")
+        dead_letters.append(url)
         return None
 
-def page_parse(html_content):
-    """解析主页面，提取电影信息和详情页链接"""
-    soup = BeautifulSoup(html_content, 'lxml')
+def page_parse(html_content, restricted=True):
+    """解析主页面，提取电影信息和详情页链接
+    restricted=True 时只构建 div.item 子树，其余部分不建树"""
+    # class 中包含 item 这个词即可，带多个class的条目也不会漏掉
+    parse_only = SoupStrainer('div', class_=lambda c: c is not None and 'item' in c.split()) if restricted else None
+    soup = BeautifulSoup(html_content, 'lxml', parse_only=parse_only)
     # 查找页面中所有的电影项目
     movie_items = soup.find_all('div', class_='item')
 
@@ -64,15 +72,16 @@ def sub_page_request(info_data):
         html = page_request(url, ua_header)
         if html:
             sub_html_list.append(html)
-        time.sleep(2) # 对详情页增加请求延迟，更友好
     return sub_html_list
 
-def sub_page_parse(sub_html_list):
-    """解析详情页，提取更详细的信息（如剧情简介）"""
+def sub_page_parse(sub_html_list, restricted=True):
+    """解析详情页，提取更详细的信息（如剧情简介）
+    restricted=True 时只构建剧情简介所在的span，不解析整个详情页"""
     detailed_list = []
+    parse_only = SoupStrainer('span', property='v:summary') if restricted else None
 
     for html_content in sub_html_list:
-        soup = BeautifulSoup(html_content, 'lxml')
+        soup = BeautifulSoup(html_content, 'lxml', parse_only=parse_only)
 
         # 尝试查找剧情简介
         # 注意：豆瓣的简介可能有多种HTML结构，这里是一种常见情况
@@ -86,7 +95,6 @@ def sub_page_parse(sub_html_list):
             summary = "未找到剧情简介"
 
         detailed_list.append(summary)
-        time.sleep(0.5) # 解析间隔
 
     return detailed_list
 
@@ -96,6 +104,25 @@ def sub_page_save(detailed_list, filename='douban_details.txt'):
         for element in detailed_list:
             txt_file.write("剧情简介: " + element + '\n\n')
 
+def crawl_list_page(url, ua, label):
+    """抓取并处理一个列表页及其详情页"""
+    html_content = page_request(url, ua)
+    if not html_content:
+        print(f"  {label}抓取失败，稍后重新排队")
+        return
+
+    info_data = page_parse(html_content)
+    save_txt(info_data)
+
+    print(f"  {label}找到 {len(info_data[0])} 部电影")
+
+    # 处理子网页（详情页）
+    if info_data[0]: # 如果有详情页链接
+        print(f"  开始解析{label}的详情页")
+        sub_html_list = sub_page_request(info_data)
+        detailed_list = sub_page_parse(sub_html_list)
+        sub_page_save(detailed_list)
+
 if __name__ == '__main__':
     print("**************开始爬取豆瓣电影Top250**************")
 
@@ -109,25 +136,22 @@ if __name__ == '__main__':
         start = page * 25
         url = f'https://movie.douban.com/top250?start={start}&filter='
         print(f"开始解析第{page+1}页 (start={start})")
-
-        html_content = page_request(url, ua_header)
-        if not html_content:
-            print(f"  第{page+1}页抓取失败，跳过")
-            continue
-
-        info_data = page_parse(html_content)
-        save_txt(info_data)
-
-        print(f"  第{page+1}页找到 {len(info_data[0])} 部电影")
-
-        # 处理子网页（详情页）
-        if info_data[0]: # 如果有详情页链接
-            print(f"  开始解析第{page+1}页的详情页")
-            sub_html_list = sub_page_request(info_data)
-            detailed_list = sub_page_parse(sub_html_list)
-            sub_page_save(detailed_list)
-
-        time.sleep(3) # 页面间延迟，遵守爬虫礼仪
+        crawl_list_page(url, ua_header, f"第{page+1}页")
+
+    # 重试后仍失败的页面在最后重新排队一次
+    failed_urls = list(dead_letters)
+    dead_letters.clear()
+    if failed_urls:
+        print(f"重新排队 {len(failed_urls)} 个失败的页面")
+    for url in failed_urls:
+        if 'top250' in url:
+            crawl_list_page(url, ua_header, url)
+        else:
+            html = page_request(url, ua_header)
+            if html:
+                sub_page_save(sub_page_parse([html]))
+    if dead_letters:
+        print(f"仍有 {len(dead_letters)} 个页面抓取失败: {dead_letters}")
 
     print("**************数据提取完成**************")
     print("电影列表已保存到 douban_movies.txt")
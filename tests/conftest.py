@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 测试直接导入项目根目录下的模块
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
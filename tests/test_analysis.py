@@ -0,0 +1,128 @@
+"""流水线检查点：--resume 何时跳过、何时重新运行阶段"""
+
+import json
+import os
+
+from conftest import FIXTURES
+from douban_analysis import CheckpointStore, Pipeline
+from douban_config import Config
+from douban_net import ResponseCache
+from douban_spider import DoubanSpider
+from douban_storage import DatabaseManager
+
+
+class _FakeSpider:
+    """只返回给定详情和失败记录的爬虫替身"""
+
+    def __init__(self, details, dead_letters):
+        self.details = details
+        self.dead_letters = dead_letters
+
+    def crawl_details(self, movies):
+        return self.details
+
+
+def _checkpoints_with_crawl(tmp_path, movies):
+    checkpoints = CheckpointStore(str(tmp_path / 'cp'))
+    path = checkpoints.path(Pipeline.CRAWL_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(movies, f)
+    checkpoints.record('crawl', 'input', checkpoints.file_digest(path), [path])
+    return checkpoints
+
+
+def test_resume_expires_crawl_and_honours_force(tmp_path):
+    checkpoints = _checkpoints_with_crawl(tmp_path, [])
+    assert Pipeline(checkpoints, resume=True)._skip('crawl', 'input', max_age_hours=24)
+    assert not Pipeline(checkpoints, resume=True, force=['crawl'])._skip('crawl', 'input', max_age_hours=24)
+
+    checkpoints.entries['crawl']['finished_at'] = '2000-01-01 00:00:00'
+    assert not Pipeline(checkpoints, resume=True)._skip('crawl', 'input', max_age_hours=24)
+    assert Pipeline(checkpoints, resume=True)._skip('crawl', 'input')
+
+
+def test_details_checkpoint_skipped_while_pages_fail(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # 数据库使用默认的相对路径
+    movies = [{'url': 'https://movie.douban.com/subject/1/'}, {'url': 'https://movie.douban.com/subject/2/'}]
+    checkpoints = _checkpoints_with_crawl(tmp_path, movies)
+    details = [{'url': movies[0]['url'], 'genres': '剧情'}]
+
+    pipeline = Pipeline(checkpoints, resume=True)
+    pipeline.spider = _FakeSpider(details, [{'url': movies[1]['url'], 'params': None, 'error': 'timeout'}])
+    assert pipeline.run(['details'])
+    assert 'details' not in checkpoints.entries  # 下次 --resume 会重新抓取
+
+    pipeline = Pipeline(checkpoints, resume=True)
+    pipeline.spider = _FakeSpider(details, [])
+    assert pipeline.run(['details'])
+    assert 'details' in checkpoints.entries
+
+
+def _offline_site(tmp_path, monkeypatch, **config):
+    """在临时目录中用离线缓存模拟网站（1 页列表页 + 每部电影的详情页），返回列表页中的电影"""
+    monkeypatch.chdir(tmp_path)
+    config = {'CACHE_DIR': str(tmp_path / 'cache'), 'CACHE_OFFLINE': True, 'MAX_PAGES': 1,
+              'ASYNC_CRAWL': True, 'FETCH_DETAILS': True, **config}
+    for name, value in config.items():
+        monkeypatch.setattr(Config, name, value)
+    with open(os.path.join(FIXTURES, 'top250_start0.html'), encoding='utf-8') as f:
+        list_page = f.read()
+    with open(os.path.join(FIXTURES, 'subject_detail.html'), encoding='utf-8') as f:
+        detail_page = f.read()
+    cache = ResponseCache(Config.CACHE_DIR, offline=True)
+    cache.put(Config.BASE_URL, {'start': 0, 'filter': ''}, list_page)
+    movies = DoubanSpider.parse_list_page(list_page)
+    for movie in movies:
+        cache.put(movie['url'], None, detail_page)
+    return movies
+
+
+def test_crawl_with_details_fills_movie_details(tmp_path, monkeypatch):
+    movies = _offline_site(tmp_path, monkeypatch)
+
+    checkpoints = CheckpointStore(str(tmp_path / 'cp'))
+    assert Pipeline(checkpoints).run(['crawl', 'clean'])
+    # 存储阶段在新的进程中运行时，详情页结果来自爬取检查点
+    assert Pipeline(CheckpointStore(str(tmp_path / 'cp'))).run(['store'])
+
+    db_manager = DatabaseManager()
+    details = db_manager.get_movie_details()
+    db_manager.close()
+    assert sorted(details['url']) == sorted(movie['url'] for movie in movies)
+    assert details['summary'].str.startswith('一场谋杀案使银行家安迪蒙冤入狱').all()
+
+
+def test_incremental_rerun_finds_no_changes(tmp_path, monkeypatch, capsys):
+    movies = _offline_site(tmp_path, monkeypatch, INCREMENTAL=True)
+    fetched = []
+    crawl_details_async = DoubanSpider.crawl_details_async
+
+    async def counting_crawl_details(spider, movies, semaphore=None):
+        fetched.extend(movie['url'] for movie in movies)
+        return await crawl_details_async(spider, movies, semaphore)
+
+    monkeypatch.setattr(DoubanSpider, 'crawl_details_async', counting_crawl_details)
+    assert Pipeline(CheckpointStore(str(tmp_path / 'cp'))).run(['crawl', 'clean', 'store'])
+    assert len(fetched) == len(movies)
+
+    fetched.clear()
+    capsys.readouterr()
+    assert Pipeline(CheckpointStore(str(tmp_path / 'cp'))).run(['crawl', 'clean', 'store'])
+    # 写库的评分与清洗结果一致（没有 float32 残留的尾数），同样的数据不再算作变化、也不再抓详情页
+    assert f'0 / {len(movies)} 部电影为新增或有变化' in capsys.readouterr().out
+    assert fetched == []
+
+
+def test_rerunning_store_keeps_one_snapshot_per_crawl(tmp_path, monkeypatch):
+    _offline_site(tmp_path, monkeypatch, FETCH_DETAILS=False)
+    checkpoints = CheckpointStore(str(tmp_path / 'cp'))
+    assert Pipeline(checkpoints).run(['crawl', 'clean', 'store'])
+    assert Pipeline(CheckpointStore(str(tmp_path / 'cp'))).run(['store'])
+
+    db_manager = DatabaseManager()
+    crawls = db_manager.get_crawls()
+    db_manager.close()
+    with open(checkpoints.path(Pipeline.CRAWL_FILE), encoding='utf-8') as f:
+        crawl_times = [movie['crawl_time'] for movie in json.load(f)]
+    # 快照批次的时间是爬取时间，而不是写库时间
+    assert crawls['crawl_time'].tolist() == [min(crawl_times)]
@@ -0,0 +1,211 @@
+"""网络层：响应缓存、重试、熔断（假会话 + 假时钟，不访问网络也不真正等待）"""
+
+import os
+import random
+
+import pytest
+import requests
+
+import douban_net
+from douban_net import (CACHE_EVICT_RATIO, CircuitBreaker, CircuitOpenError, ResponseCache, RetryPolicy,
+                        fetch_text, parse_retry_after)
+
+
+class FakeClock:
+    """代替 douban_net 中的 time 模块：sleep 只推进时间并记录等待了多久"""
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    perf_counter = monotonic
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.encoding = None
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code} Error', response=self)
+
+
+class FakeSession:
+    """按顺序返回预设的响应（或抛出预设的异常），并记录每次请求"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append({'url': url, 'params': params, 'headers': dict(headers or {})})
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(douban_net, 'time', fake)
+    return fake
+
+
+def http_error(status_code):
+    return requests.exceptions.HTTPError(response=FakeResponse(status_code))
+
+
+def test_backoff_stays_within_full_jitter_bounds():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+    random.seed(0)
+    for attempt in range(6):
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert 0 <= min(delays) and max(delays) <= min(5.0, 2 ** attempt)
+    # 服务器给出的 Retry-After 是下限，但同样不超过 max_delay
+    assert policy.delay(0, retry_after=3.0) >= 3.0
+    assert policy.delay(0, retry_after=60.0) == 5.0
+
+
+def test_parse_retry_after_seconds_and_http_date(clock):
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after('-3') == 0.0
+    clock.now = 1445412450.0  # Wed, 21 Oct 2015 07:27:30 GMT
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == pytest.approx(30.0)
+    assert parse_retry_after('Wed, 21 Oct 2015 07:27:00 GMT') == 0.0  # 已经过去的时间
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+def test_only_idempotent_transient_failures_are_retried():
+    policy = RetryPolicy()
+    assert policy.is_retryable(requests.exceptions.ConnectionError())
+    assert policy.is_retryable(requests.exceptions.Timeout())
+    assert policy.is_retryable(http_error(503)) and policy.is_retryable(http_error(429))
+    assert not policy.is_retryable(http_error(404))
+    assert not policy.is_retryable(requests.exceptions.ConnectionError(), method='POST')
+    assert policy.is_retryable(http_error(503), method='head')
+
+
+def test_breaker_counts_only_host_level_failures():
+    assert CircuitBreaker.is_failure(requests.exceptions.ConnectionError())
+    for status in (403, 429, 500, 503):
+        assert CircuitBreaker.is_failure(http_error(status))
+    for status in (404, 410):
+        assert not CircuitBreaker.is_failure(http_error(status))
+
+
+def test_breaker_open_half_open_close(clock):
+    url = 'https://movie.douban.com/top250'
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure(url)
+    assert breaker.allow(url)  # 还没到阈值
+    breaker.record_failure(url)
+    assert not breaker.allow(url) and breaker.remaining(url) == 60  # 打开
+
+    clock.now += 60
+    assert breaker.allow(url)  # 冷却结束，半开放行试探请求
+    breaker.record_failure(url)
+    assert not breaker.allow(url)  # 试探失败立即重新打开
+
+    clock.now += 60
+    breaker.record_success(url)  # 试探成功，关闭并清零
+    breaker.record_failure(url)
+    assert breaker.allow(url)
+    assert breaker.allow('https://img.doubanio.com/x.jpg')  # 按主机独立计数
+
+
+def test_fetch_text_retries_with_retry_after(clock):
+    session = FakeSession(FakeResponse(503, headers={'Retry-After': '4'}),
+                          requests.exceptions.ConnectionError('reset'), FakeResponse(200, 'ok'))
+    breaker = CircuitBreaker(failure_threshold=5)
+    text = fetch_text(session.get, 'https://movie.douban.com/top250', retry=RetryPolicy(max_retries=3),
+                      breaker=breaker)
+    assert text == 'ok' and len(session.requests) == 3
+    assert clock.sleeps[0] >= 4  # 遵守 Retry-After
+    assert breaker._failures['movie.douban.com'] == 0  # 成功后清零
+
+
+def test_fetch_text_gives_up_on_client_errors_and_open_breaker(clock):
+    url = 'https://movie.douban.com/subject/0/'
+    breaker = CircuitBreaker(failure_threshold=1)
+    session = FakeSession(FakeResponse(404))
+    with pytest.raises(requests.exceptions.HTTPError):
+        fetch_text(session.get, url, retry=RetryPolicy(), breaker=breaker)
+    assert len(session.requests) == 1 and clock.sleeps == []  # 404 不重试
+    assert breaker.allow(url)  # 也不计入熔断
+
+    session = FakeSession(FakeResponse(500), FakeResponse(200, 'never'))
+    with pytest.raises(requests.exceptions.HTTPError):
+        fetch_text(session.get, url, retry=RetryPolicy(max_retries=0), breaker=breaker)
+    with pytest.raises(CircuitOpenError):
+        fetch_text(session.get, url, retry=RetryPolicy(), breaker=breaker)
+    assert len(session.requests) == 1  # 熔断时不再发出请求
+
+
+def test_cache_key_is_canonical():
+    # test.py 把查询参数写在URL里，爬虫用 params 传入，两者必须命中同一条缓存
+    url = 'https://movie.douban.com/top250'
+    assert (ResponseCache.key(f'{url}?start=0&filter=') == ResponseCache.key(url, {'start': 0, 'filter': ''})
+            == ResponseCache.key(f'{url}?filter=', {'start': '0'}))
+    assert ResponseCache.key(url, {'start': 25}) != ResponseCache.key(url, {'start': 0})
+
+
+def test_cache_ttl_expiry(tmp_path, clock):
+    url = 'https://movie.douban.com/subject/1/'
+    cache = ResponseCache(str(tmp_path), ttl=100)
+    cache.put(url, None, 'body')
+    assert cache.get_fresh(url) == 'body'
+    clock.now += 100
+    assert cache.get_fresh(url) is None and cache.get(url)['body'] == 'body'  # 过期记录仍保留用于重新验证
+    assert ResponseCache(str(tmp_path), ttl=100, offline=True).get_fresh(url) == 'body'  # 离线模式忽略有效期
+
+
+def test_expired_entry_revalidated_with_304(tmp_path, clock, monkeypatch):
+    url = 'https://movie.douban.com/subject/1/'
+    cache = ResponseCache(str(tmp_path), ttl=100)
+    cache.put(url, None, 'cached', {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+    clock.now += 200
+    reads = []
+    get = cache.get
+    monkeypatch.setattr(cache, 'get', lambda *args: reads.append(args) or get(*args))
+
+    session = FakeSession(FakeResponse(304, headers={'ETag': '"v2"'}))
+    assert fetch_text(session.get, url, cache=cache) == 'cached'
+    assert session.requests[0]['headers']['If-None-Match'] == '"v1"'
+    assert session.requests[0]['headers']['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+    assert len(reads) == 1  # 缓存记录只读取一次，304 时直接沿用
+    entry = get(url)
+    assert entry['etag'] == '"v2"' and entry['stored_at'] == clock.now  # 重新计算有效期
+    assert fetch_text(FakeSession().get, url, cache=cache) == 'cached'  # 之后直接命中，不再发请求
+
+
+def test_cache_evicts_least_recently_used_below_ratio(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    urls = [f'https://movie.douban.com/subject/{i}/' for i in range(5)]
+    for age, url in enumerate(urls):
+        cache.put(url, None, 'x' * 1900)
+        if age == 0:
+            cache.max_bytes = int(cache._total * 5.5)  # 能放下5条记录，第6条写入时淘汰到 4.95 条以下
+        body_path = os.path.join(str(tmp_path), ResponseCache.key(url) + '.html')
+        os.utime(body_path, (1000 + age, 1000 + age))  # 访问时间依次递增
+    cache.get(urls[0])  # 最早写入的记录刚被访问过，不应被淘汰
+
+    cache.put(urls[0] + 'new', None, 'x' * 1900)  # 超过上限，触发淘汰
+    kept = [url for url in urls if cache.get(url) is not None]
+    on_disk = sum(os.path.getsize(os.path.join(str(tmp_path), name)) for name in os.listdir(str(tmp_path)))
+    assert kept == [urls[0], urls[3], urls[4]]
+    assert cache._total == on_disk <= cache.max_bytes * CACHE_EVICT_RATIO
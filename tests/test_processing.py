@@ -0,0 +1,32 @@
+"""数据处理：标签统计的缓存何时命中、何时失效"""
+
+import pandas as pd
+import pytest
+
+from douban_processing import TagAnalytics
+
+
+@pytest.mark.parametrize('dtype', [object, 'category'])
+def test_tag_counts_cache_follows_column_changes(dtype):
+    movies = pd.DataFrame({'tags': pd.Series(['剧情,犯罪', '剧情,爱情', '剧情,犯罪'], dtype=dtype)})
+    counts = TagAnalytics.counts(movies)
+    assert counts.to_dict() == {'剧情': 3, '犯罪': 2, '爱情': 1}
+    assert TagAnalytics.counts(movies) is counts  # 数据没变，直接命中缓存
+
+    # 重新赋值标签列：版本标记变化，自动重新计算
+    movies['tags'] = pd.Series(['动画', '动画', '剧情,犯罪'], dtype=dtype)
+    assert TagAnalytics.counts(movies).to_dict() == {'动画': 2, '剧情': 1, '犯罪': 1}
+
+    # 原地修改单元格不会改变版本标记，调用 invalidate 后重新计算
+    movies.loc[0, 'tags'] = '剧情,犯罪'
+    TagAnalytics.invalidate(movies)
+    assert TagAnalytics.counts(movies).to_dict() == {'剧情': 2, '犯罪': 2, '动画': 1}
+
+
+def test_tag_cache_entry_released_with_dataframe():
+    movies = pd.DataFrame({'tags': ['剧情', '爱情']})
+    TagAnalytics.counts(movies)
+    key = id(movies)
+    assert key in TagAnalytics._cache
+    del movies
+    assert key not in TagAnalytics._cache
@@ -0,0 +1,44 @@
+"""分析报告：SQL 聚合与 pandas 回退的结果一致"""
+
+import pandas as pd
+
+from douban_processing import DataProcessor
+from douban_report import AnalysisReporter
+from douban_storage import DatabaseManager
+
+
+def test_sql_and_pandas_tag_order_match(tmp_path):
+    # 后出现的标签字母序更靠前，次数全部相同：两条路径都必须按标签排序
+    movies = pd.DataFrame({
+        'rank': [1, 2, 3, 4], 'title': ['甲', '乙', '丙', '丁'],
+        'rating': [9.7, 9.6, 9.5, 9.4], 'votes': [400, 300, 200, 100],
+        'director': ['A', 'B', 'C', 'D'], 'year': [1994, 1993, 1994, 1994], 'country': ['美国'] * 4,
+        'tags': ['剧情 犯罪', '爱情 战争', 'crime drama', 'war love'],
+    })
+    cleaned = DataProcessor().clean_data(movies)
+    db_manager = DatabaseManager(str(tmp_path / 'movies.db'))
+    db_manager.save_movies(cleaned)
+    sql_tags = db_manager.report_aggregates(top_tags=5)['tags']
+    db_manager.close()
+
+    pandas_tags = AnalysisReporter.compute_aggregates(cleaned, top_tags=5)['tags']
+    assert [tag for tag, _ in sql_tags] == [tag for tag, _ in pandas_tags]
+    assert [tag for tag, _ in pandas_tags] == sorted(tag for tag, _ in pandas_tags)
+
+
+def test_sql_and_pandas_director_order_match(tmp_path):
+    # 作品数并列的导演按最好的排名排序（A 的最好排名是第1名，B 是第2名），与出现顺序不同
+    movies = pd.DataFrame({
+        'rank': [2, 1, 3, 4, 5], 'title': ['甲', '乙', '丙', '丁', '戊'],
+        'rating': [9.7, 9.6, 9.5, 9.4, 9.3], 'votes': [500, 400, 300, 200, 100],
+        'director': ['B', 'A', 'B', 'A', 'C'], 'year': [1994] * 5, 'country': ['美国'] * 5,
+        'tags': ['剧情'] * 5,
+    })
+    cleaned = DataProcessor().clean_data(movies)
+    db_manager = DatabaseManager(str(tmp_path / 'movies.db'))
+    db_manager.save_movies(cleaned)
+    sql_directors = db_manager.report_aggregates(top_directors=3)['directors']
+    db_manager.close()
+
+    pandas_directors = AnalysisReporter.compute_aggregates(cleaned, top_directors=3)['directors']
+    assert [tuple(row) for row in sql_directors] == pandas_directors == [('A', 2), ('B', 2), ('C', 1)]
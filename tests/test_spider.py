@@ -0,0 +1,71 @@
+"""爬虫子系统：列表页解析"""
+
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from conftest import FIXTURES
+from douban_config import Config
+from douban_net import ResponseCache
+from douban_spider import DoubanSpider
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def without_time(movies):
+    """crawl_time 是解析时刻，不参与比较"""
+    return [dict(movie, crawl_time=None) for movie in movies]
+
+
+# top250_multiclass.html：同一页面，但条目带有多个class（"item grid-item" 等）
+PAGES = ['top250_start0.html', 'top250_multiclass.html']
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_lxml_backend_matches_bs4(name):
+    html = load_fixture(name)
+    expected = DoubanSpider.parse_list_page(html, backend='bs4', restricted=False)
+    assert len(expected) == 4
+    assert without_time(DoubanSpider.parse_list_page(html, backend='lxml')) == without_time(expected)
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_restricted_parse_matches_full_parse(name):
+    html = load_fixture(name)
+    expected = DoubanSpider.parse_list_page(html, backend='bs4', restricted=False)
+    assert without_time(DoubanSpider.parse_list_page(html, backend='bs4', restricted=True)) == without_time(expected)
+
+
+def test_parity_check_on_fixture_pages():
+    pages = [(name, load_fixture(name)) for name in PAGES]
+    assert DoubanSpider.check_parser_parity(pages=pages) == []
+
+
+def test_parity_check_fails_without_pages(tmp_path):
+    assert list(DoubanSpider.cached_list_pages(str(tmp_path / 'missing'))) == []
+    assert DoubanSpider.check_parser_parity(str(tmp_path / 'missing')) != []
+    assert DoubanSpider.check_parser_parity(str(tmp_path)) != []
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='只有 fork 方式会复制其他线程持有的锁')
+def test_pipeline_forks_parsers_before_starting_threads(tmp_path, monkeypatch):
+    for name, value in {'MAX_PAGES': 1, 'PIPELINE_WORKERS': 2, 'FETCH_DETAILS': False}.items():
+        monkeypatch.setattr(Config, name, value)
+    cache = ResponseCache(str(tmp_path), offline=True)
+    cache.put(Config.BASE_URL, {'start': 0, 'filter': ''}, load_fixture('top250_start0.html'))
+    children = []  # 每个线程启动时已经存在的解析进程数
+    start = threading.Thread.start
+
+    def recording_start(thread):
+        children.append(len(multiprocessing.active_children()))
+        start(thread)
+
+    monkeypatch.setattr(threading.Thread, 'start', recording_start)
+    movies = DoubanSpider(cache=cache).crawl_pipeline()
+    assert len(movies) == 4
+    assert children and min(children) == 2  # 抓取线程启动前两个解析进程都已 fork
@@ -0,0 +1,108 @@
+"""存储子系统：SQLite 写库"""
+
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from conftest import FIXTURES
+from douban_net import ResponseCache
+from douban_processing import DataProcessor
+from douban_spider import DoubanSpider
+from douban_storage import DatabaseManager
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def crawled_movies(tmp_path):
+    """列表页 + 详情页都从离线缓存读取，走与线上相同的抓取/解析流程"""
+    cache = ResponseCache(str(tmp_path / 'cache'), offline=True)
+    movies = DoubanSpider.parse_list_page(load_fixture('top250_start0.html'))
+    for movie in movies:
+        cache.put(movie['url'], None, load_fixture('subject_detail.html'))
+    spider = DoubanSpider(cache=cache)
+    spider.fetch_details(movies)
+    return movies
+
+
+def stored_summaries(db_manager):
+    return dict(db_manager.conn.execute("SELECT title, summary FROM movies"))
+
+
+def test_fetched_summary_reaches_database(tmp_path, crawled_movies):
+    db_manager = DatabaseManager(str(tmp_path / 'movies.db'))
+    db_manager.save_movies(DataProcessor().clean_data(pd.DataFrame(crawled_movies)))
+    summaries = stored_summaries(db_manager)
+    db_manager.close()
+    assert len(summaries) == 4
+    assert all(summary.startswith('一场谋杀案使银行家安迪蒙冤入狱') for summary in summaries.values())
+
+
+def test_incremental_save_keeps_summary(tmp_path, crawled_movies):
+    db_manager = DatabaseManager(str(tmp_path / 'movies.db'))
+    db_manager.save_movies_incremental(DataProcessor().clean_data(pd.DataFrame(crawled_movies)))
+    summaries = stored_summaries(db_manager)
+    db_manager.close()
+    assert all('二十年后' in summary for summary in summaries.values())
+
+
+def test_old_database_gets_summary_column(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(db_path)
+    # 加入 summary 列之前的 movies 表结构
+    conn.execute('''CREATE TABLE movies (id INTEGER PRIMARY KEY AUTOINCREMENT, rank INTEGER,
+                    title TEXT NOT NULL, rating REAL, votes INTEGER, director TEXT, year INTEGER,
+                    country TEXT, tags TEXT, `quote` TEXT, url TEXT, image_url TEXT,
+                    rating_category TEXT, popularity REAL, crawl_time TEXT, UNIQUE(title))''')
+    conn.execute("INSERT INTO movies (rank, title, rating) VALUES (1, '肖申克的救赎', 9.7)")
+    conn.commit()
+    conn.close()
+
+    db_manager = DatabaseManager(db_path)
+    rows = db_manager.conn.execute("SELECT title, summary FROM movies").fetchall()
+    db_manager.close()
+    assert rows == [('肖申克的救赎', None)]
+
+
+def snapshot_frame(rows):
+    return pd.DataFrame(rows, columns=['title', 'rank', 'votes', 'rating'])
+
+
+def test_snapshots_skip_unchanged_and_mark_dropouts(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'movies.db'))
+    first = db_manager.record_snapshot(snapshot_frame([('甲', 1, 100, 9.7), ('乙', 2, 90, 9.6)]),
+                                       '2024-01-01 00:00:00')
+    # 甲完全没变，不写新行；乙下榜，写一条 rank 为 NULL 的快照
+    second = db_manager.record_snapshot(snapshot_frame([('甲', 1, 100, 9.7)]), '2024-01-02 00:00:00')
+    # 同一爬取时间再记录一次：返回已有批次，不新增任何行
+    again = db_manager.record_snapshot(snapshot_frame([('甲', 2, 120, 9.7)]), '2024-01-02 00:00:00')
+    snapshots = db_manager.conn.execute('''
+        SELECT k.title, s.crawl_id, s.rank FROM movie_snapshots s JOIN movie_keys k ON k.id = s.movie_id
+        ORDER BY s.crawl_id, k.title''').fetchall()
+    crawl_count = len(db_manager.get_crawls())
+    db_manager.close()
+
+    assert again == second != first
+    assert crawl_count == 2
+    assert snapshots == [('乙', first, 2), ('甲', first, 1), ('乙', second, None)]
+
+
+def test_movie_history_fill_carries_last_snapshot(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / 'movies.db'))
+    for day, rank in [(1, 3), (2, 3), (3, 1)]:
+        db_manager.record_snapshot(snapshot_frame([('甲', rank, 100, 9.7)]), f'2024-01-0{day} 00:00:00')
+    db_manager.record_snapshot(snapshot_frame([('乙', 1, 50, 9.0)]), '2024-01-04 00:00:00')  # 甲下榜
+    sparse = db_manager.get_movie_history('甲')
+    filled = db_manager.get_movie_history('甲', fill=True)
+    db_manager.close()
+
+    assert sparse['crawl_time'].tolist() == ['2024-01-01 00:00:00', '2024-01-03 00:00:00', '2024-01-04 00:00:00']
+    assert sparse['rank'].iloc[:2].tolist() == [3, 1] and pd.isna(sparse['rank'].iloc[2])
+    assert filled['crawl_time'].tolist() == [f'2024-01-0{day} 00:00:00' for day in range(1, 5)]
+    assert filled['rank'].tolist()[:3] == [3, 3, 1]  # 第2次爬取省略的快照沿用第1次的排名
+    assert pd.isna(filled['rank'].iloc[3])  # 下榜记录本身是 NULL
@@ -0,0 +1,44 @@
+"""词云布局缓存：默认的进程池渲染路径也能复用布局"""
+
+import json
+
+import pandas as pd
+from wordcloud import WordCloud
+
+from douban_config import Config
+from douban_processing import DataProcessor
+from douban_visualization import DataVisualizer, WordCloudRenderer
+
+
+def _movies():
+    return DataProcessor().clean_data(pd.DataFrame({
+        'rank': [1, 2, 3, 4], 'title': ['甲', '乙', '丙', '丁'],
+        'rating': [9.7, 9.6, 9.5, 9.4], 'votes': [400, 300, 200, 100],
+        'director': ['A', 'B', 'C', 'D'], 'year': [1994, 1993, 1994, 1995], 'country': ['美国'] * 4,
+        'tags': ['drama crime', 'love war', 'drama love', 'war drama'],
+    }))
+
+
+def test_pool_render_reuses_persisted_layout(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    charts = ['create_wordcloud', 'plot_yearly_trend']  # 两张图才会真正进入进程池
+    movies = _movies()
+    key = WordCloudRenderer.fingerprint(WordCloudRenderer.frequencies(movies))
+
+    timings = DataVisualizer(movies).render_all(charts, parallel=True, workers=2)
+    assert set(timings) == set(charts)
+    # 布局由子进程计算，必须落到布局文件中，而不是随子进程一起丢失
+    with open(Config.WORDCLOUD_LAYOUTS, encoding='utf-8') as f:
+        assert key in json.load(f)
+
+    # 删掉图片和清单迫使重新渲染；再计算布局就会失败，只能沿用布局文件
+    for name in charts:
+        (tmp_path / DataVisualizer.chart_path(name)).unlink()
+    (tmp_path / Config.CHART_MANIFEST).unlink()
+    WordCloudRenderer._layouts.clear()
+    monkeypatch.setattr(WordCloud, 'generate_from_frequencies',
+                        lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError('重新计算了布局')))
+
+    timings = DataVisualizer(movies).render_all(charts, parallel=True, workers=2)
+    assert set(timings) == set(charts)
+    assert (tmp_path / DataVisualizer.chart_path('create_wordcloud')).exists()